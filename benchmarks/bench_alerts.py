@@ -0,0 +1,64 @@
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from mock_server import MockServer
+from pycampbellcloud import AlertWatcher, page_records
+
+
+def naive_cycle(client, window: int):
+    # Re-downloads the whole look-back window every cycle, the way the polling loop this replaces did
+    end_epoch = int(time.time() * 1000)
+    records, offset = [], 0
+    while True:
+        page = page_records(client.list_alert_events("station-offline", end_epoch, start_epoch=end_epoch - window,
+                                                     offset=offset))
+        records.extend(page)
+        offset += len(page)
+        if len(page) < 100:
+            return records
+
+
+def main(cycles: int=20, backlog: int=1000, per_cycle: int=3, window: int=60 * 60 * 1000):
+    with MockServer() as server:
+        now = int(time.time() * 1000)
+        for index in range(backlog):
+            server.data.raise_alert("station-offline", now - window + index * (window // backlog))
+        with server.client() as client:
+            client.get_organization_plan()
+
+            server.reset_stats()
+            delivered = 0
+            for _ in range(cycles):
+                for _ in range(per_cycle):
+                    server.data.raise_alert("station-offline")
+                delivered += len(naive_cycle(client, window))
+            print(f"{'naive window polling':<22} delivered={delivered:<7} requests={server.requests:<5} "
+                  f"MB sent={server.bytes_sent / 1e6:.2f}")
+
+            server.reset_stats()
+            received = []
+            watcher = AlertWatcher(client, "station-offline", overlap=5_000, min_interval=0.01,
+                                   callbacks=[lambda alert_filter, record: received.append(record["id"])])
+            for _ in range(cycles):
+                for _ in range(per_cycle):
+                    server.data.raise_alert("station-offline")
+                watcher.poll()
+            print(f"{'AlertWatcher':<22} delivered={len(received):<7} requests={server.requests:<5} "
+                  f"MB sent={server.bytes_sent / 1e6:.2f} unique={len(set(received)) == len(received)} "
+                  f"stats={watcher.stats()}")
+
+            async def tail():
+                async for event in watcher:
+                    watcher.stop()
+                    return event
+
+            server.data.raise_alert("station-offline", state="triggered")
+            print(f"async iterator received {asyncio.run(tail()).record}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from mock_server import MockData, MockServer
+from pycampbellcloud import DatapointBatchPlanner, Transport, datapoint_records
+
+
+def per_datastream(client, aliases: list, start_epoch: int, end_epoch: int, workers: int):
+    # One get_datastream_datapoints call per datastream, the way the planner's callers did it before
+    def fetch(alias):
+        return datapoint_records(client.get_datastream_datapoints(alias, start_epoch, end_epoch, limit=1000))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(aliases, pool.map(fetch, aliases)))
+
+
+def timed(server: MockServer, call):
+    server.reset_stats()
+    start = time.perf_counter()
+    result = call()
+    return result, time.perf_counter() - start, server.stats()["requests"]
+
+
+def main(datastreams: int=500, minutes: int=240, latency: float=0.02, workers: int=8):
+    data = MockData(datastreams=datastreams)
+    aliases = [record["alias"] for record in data.datastreams]
+    start_epoch = data.end_epoch - minutes * 60_000
+    with MockServer(data=data, latency=latency) as server:
+        transport = Transport(pool_maxsize=workers)
+        with server.client(transport=transport) as client:
+            client.get_organization_plan()
+            expected, elapsed, requests = timed(server, lambda: per_datastream(
+                client, aliases, start_epoch, data.end_epoch, workers))
+            print(f"{'per datastream':<28} datastreams={len(expected):<5} requests={requests:<5} {elapsed:.2f}s")
+
+            for max_url_length, max_aliases in ((2048, 100), (2048, 500), (8192, 500)):
+                planner = DatapointBatchPlanner(client, max_url_length=max_url_length, max_aliases=max_aliases,
+                                                max_workers=workers)
+                result, elapsed, requests = timed(server, lambda: planner.fetch(aliases, start_epoch, data.end_epoch))
+                label = f"batched, {max_url_length} chars/{max_aliases}"
+                print(f"{label:<28} datastreams={len(result):<5} requests={requests:<5} {elapsed:.2f}s "
+                      f"identical={result == expected}")
+        transport.close()
+
+
+if __name__ == "__main__":
+    main()
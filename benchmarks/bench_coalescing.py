@@ -0,0 +1,37 @@
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from mock_server import MockServer
+from pycampbellcloud import RequestCoalescer, Transport
+
+
+def run(server: MockServer, label: str, coalescer: RequestCoalescer | None, calls: int, workers: int, hot: int):
+    # Many threads read the same few "last value" endpoints at once, as a busy web backend would
+    transport = Transport(pool_maxsize=workers, coalescer=coalescer)
+    with server.client(transport=transport) as client:
+        client.get_organization_plan()
+        server.reset_stats()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda i: client.get_datastream_datapoints_last(f"ds-{i % hot:05d}"), range(calls)))
+        elapsed = time.perf_counter() - start
+    transport.close()
+    failed = sum(1 for result in results if "data" not in result)
+    stats = "" if coalescer is None else f" stats={coalescer.stats()}"
+    print(f"{label:<30} requests={server.stats()['requests']:<6} failed={failed:<4} "
+          f"calls/s={calls / elapsed:<8.0f}{stats}")
+
+
+def main(calls: int=2000, workers: int=32, hot: int=4, latency: float=0.02):
+    with MockServer(latency=latency) as server:
+        run(server, "no coalescing", None, calls, workers, hot)
+        run(server, "single-flight", RequestCoalescer(), calls, workers, hot)
+        run(server, "single-flight + 250 ms window", RequestCoalescer(window=0.25), calls, workers, hot)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from pycampbellcloud import DatapointFrame, numpy
+
+
+def make_response(datastreams: int, points: int):
+    return [{"datastream_id": f"ds-{index}",
+             "data": [{"ts": 1_700_000_000_000 + i * 60_000, "value": (i % 1000) * 0.5} for i in range(points)]}
+            for index in range(datastreams)]
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def timed(func, repeat: int=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main(datastreams: int=4, points: int=250_000):
+    print(f"backend={'numpy' if numpy is not None else 'array.array'} datastreams={datastreams} points={points}")
+    response, dict_bytes, _ = measure(lambda: make_response(datastreams, points))
+    frame, column_bytes, build_time = measure(lambda: DatapointFrame.from_response(response))
+
+    def dict_means():
+        return {group["datastream_id"]: sum(point["value"] for point in group["data"]) / len(group["data"])
+                for group in response}
+
+    def column_means():
+        return {datastream_id: columns.mean() for datastream_id, columns in frame.items()}
+
+    window = (1_700_000_000_000 + points * 15_000, 1_700_000_000_000 + points * 45_000)
+
+    def dict_window():
+        return [[point for point in group["data"] if window[0] <= point["ts"] <= window[1]] for group in response]
+
+    def column_window():
+        return frame.between(*window)
+
+    _, dict_mean_time = timed(dict_means)
+    _, column_mean_time = timed(column_means)
+    _, dict_window_time = timed(dict_window)
+    _, column_window_time = timed(column_window)
+    print(f"{'':<12}{'memory MB':>12}{'mean ms':>12}{'window ms':>12}")
+    print(f"{'dicts':<12}{dict_bytes / 1e6:>12.1f}{dict_mean_time * 1e3:>12.2f}{dict_window_time * 1e3:>12.2f}")
+    print(f"{'columns':<12}{column_bytes / 1e6:>12.1f}{column_mean_time * 1e3:>12.2f}{column_window_time * 1e3:>12.2f}")
+    print(f"columnar conversion took {build_time * 1e3:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from mock_server import MockServer
+from pycampbellcloud import DatapointFrame, UnitConverter, linear_coefficients, numpy
+
+UNITS = ("temperature", "degC", "degF")
+
+
+def make_response(datastreams: int, points: int):
+    return [{"datastream_id": f"ds-{index}",
+             "data": [{"ts": 1_700_000_000_000 + i * 60_000, "value": (i % 400) * 0.1} for i in range(points)]}
+            for index in range(datastreams)]
+
+
+def per_value_loop(client, response):
+    # The baseline: fetch the conversion for every datastream and convert one value at a time
+    converted = {}
+    for group in response:
+        multiplier, offset = linear_coefficients(client.get_measurement_classification_conversions_by_id(*UNITS))
+        converted[group["datastream_id"]] = [point["value"] * multiplier + offset for point in group["data"]]
+    return converted
+
+
+def vectorized(converter, frame):
+    return converter.convert_frame(frame, {datastream_id: UNITS for datastream_id in frame})
+
+
+def main(datastreams: int=50, points: int=20_000):
+    print(f"backend={'numpy' if numpy is not None else 'array.array'} datastreams={datastreams} points={points}")
+    response = make_response(datastreams, points)
+    frame = DatapointFrame.from_response(response)
+    with MockServer(latency=0.002) as server, server.client() as client:
+        client.get_organization_plan()
+        server.reset_stats()
+        start = time.perf_counter()
+        per_value_loop(client, response)
+        loop_time, loop_requests = time.perf_counter() - start, server.requests
+
+        server.reset_stats()
+        converter = UnitConverter(client)
+        start = time.perf_counter()
+        vectorized(converter, frame)
+        vector_time, vector_requests = time.perf_counter() - start, server.requests
+    print(f"{'per-value loop':<16} {loop_time * 1e3:>8.1f} ms  conversion requests={loop_requests}")
+    print(f"{'vectorized':<16} {vector_time * 1e3:>8.1f} ms  conversion requests={vector_requests}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from mock_server import MockServerProcess
+from pycampbellcloud import ExportPipeline
+
+
+def main(files: int=4, file_size: int=32 << 20, chunk_size: int=1 << 20):
+    server = MockServerProcess(data_options={"export_files": files, "export_file_size": file_size})
+    with server, server.client() as client, tempfile.TemporaryDirectory() as directory:
+        pipeline = ExportPipeline(client, directory, max_workers=files, chunk_size=chunk_size, poll_interval=0.05)
+        tracemalloc.start()
+        start = time.perf_counter()
+        paths = pipeline.run({"name": "benchmark export"})
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        total = sum(os.path.getsize(path) for path in paths)
+        print(f"downloaded {len(paths)} files, {total / 1e6:.0f} MB in {elapsed:.2f}s, "
+              f"peak client memory {peak / 1e6:.1f} MB")
+
+        # Simulate an interrupted transfer: truncate one file back to a partial download and resume it
+        path = paths[0]
+        os.replace(path, path + ".part")
+        with open(path + ".part", "r+b") as partial:
+            partial.truncate(file_size // 3)
+        server.reset_stats()
+        pipeline.download_export("exp-0", "job-0")
+        print(f"resumed {os.path.basename(path)}: {server.stats()['bytes_sent'] / 1e6:.1f} MB re-sent for a "
+              f"{file_size / 1e6:.0f} MB file, size verified={os.path.getsize(path) == file_size}")
+
+
+if __name__ == "__main__":
+    main()
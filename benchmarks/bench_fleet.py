@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from mock_server import MockData, MockServer
+from pycampbellcloud import FleetSnapshot, Transport, page_records
+
+
+def sequential(client):
+    # The loop the snapshot replaces: every state fetched one by one
+    states = {}
+    for kind, list_method, state_method in (("station", "list_stations", "get_station_state"),
+                                            ("asset", "list_assets", "get_asset_state")):
+        for record in page_records(getattr(client, list_method)()):
+            states[(kind, record["id"])] = getattr(client, state_method)(record["id"])
+    return states
+
+
+def timed(server: MockServer, call):
+    server.reset_stats()
+    start = time.perf_counter()
+    result = call()
+    return result, time.perf_counter() - start, server.stats()["requests"]
+
+
+def main(stations: int=300, assets: int=300, latency: float=0.01, workers: int=32):
+    data = MockData(stations=stations, assets=assets)
+    with MockServer(data=data, latency=latency) as server:
+        transport = Transport(pool_maxsize=workers)
+        with server.client(transport=transport) as client:
+            client.get_organization_plan()
+            states, elapsed, requests = timed(server, lambda: sequential(client))
+            print(f"{'sequential loop':<28} members={len(states):<5} requests={requests:<5} {elapsed:.2f}s")
+
+            fleet = FleetSnapshot(client, max_workers=workers, full_every=10)
+            diff, elapsed, requests = timed(server, fleet.tick)
+            print(f"{'first snapshot':<28} added={len(diff.added):<7} requests={requests:<5} {elapsed:.2f}s")
+
+            for index in range(0, stations, 50):
+                data.set_state(f"st-{index:04d}", status="offline")
+            diff, elapsed, requests = timed(server, fleet.snapshot)
+            print(f"{'full snapshot, 6 changed':<28} changed={len(diff.changed):<5} requests={requests:<5} "
+                  f"{elapsed:.2f}s")
+
+            data.set_state("st-0000", status="online")
+            diff, elapsed, requests = timed(server, fleet.tick)
+            print(f"{'suspicious subset tick':<28} changed={len(diff.changed):<5} requests={requests:<5} "
+                  f"{elapsed:.3f}s")
+            print(f"suspicious for the next tick: {sorted(fleet.suspicious)}")
+        transport.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from mock_server import MockData, MockServer
+from pycampbellcloud import ClientPool, page_records
+
+
+def client_per_organization(server: MockServer, organizations: list):
+    # One login and one connection pool per organization, called one after the other
+    records = []
+    for organization_id in organizations:
+        with server.client(organization_id) as client:
+            records.extend(page_records(client.list_stations()))
+    return records
+
+
+def main(organizations: int=24, latency: float=0.02, workers: int=8):
+    with MockServer(data=MockData(organizations=organizations), latency=latency) as server:
+        organization_ids = [f"org-{index}" for index in range(organizations)]
+        start = time.perf_counter()
+        records = client_per_organization(server, organization_ids)
+        elapsed = time.perf_counter() - start
+        print(f"{'client per organization':<26} records={len(records):<6} requests={server.requests:<4} "
+              f"connections={server.connections:<4} {elapsed:.2f}s")
+
+        server.reset_stats()
+        start = time.perf_counter()
+        with ClientPool("mock-user", "mock-password", regions={"mock": server.api_url}, max_workers=workers) as pool:
+            records = pool.fan_out_records("list_stations")
+        elapsed = time.perf_counter() - start
+        print(f"{'ClientPool fan-out':<26} records={len(records):<6} requests={server.requests:<4} "
+              f"connections={server.connections:<4} {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
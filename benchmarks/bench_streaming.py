@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from mock_server import MockData, MockServerProcess
+import pycampbellcloud
+
+
+def measure(label: str, func):
+    # Timed and traced in separate runs, tracemalloc slows allocation heavy parsing down several times
+    start = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} points={count:<9} {elapsed:>6.2f}s  peak memory {peak / 1e6:>7.1f} MB")
+
+
+def main(aliases: int=20, points: int=20_000):
+    data = MockData(datastreams=aliases, points=points)
+    alias_list = ",".join(record["alias"] for record in data.datastreams)
+    server = MockServerProcess(data_options={"datastreams": aliases, "points": points}, max_points=points)
+    with server, server.client() as client:
+        client.get_organization_plan()
+        measure("get_datapoints (.json())", lambda: sum(
+            len(group["data"]) for group in client.get_datapoints(alias_list, data.origin, data.end_epoch)))
+        measure("stream_datapoints", lambda: sum(
+            1 for _ in client.stream_datapoints(alias_list, data.origin, data.end_epoch)))
+        measure("stream_datapoints (batches)", lambda: sum(
+            len(batch) for batch in client.stream_datapoints(alias_list, data.origin, data.end_epoch,
+                                                             batch_size=1000)))
+        # Single datastream objects are where ijson is used when it is installed
+        for backend in ("ijson", "stdlib") if pycampbellcloud.ijson is not None else ("stdlib",):
+            if backend == "stdlib":
+                pycampbellcloud.ijson = None
+            measure(f"per datastream ({backend})", lambda: sum(
+                1 for record in data.datastreams
+                for _ in client.stream_datastream_datapoints(record["id"], data.origin, data.end_epoch, limit=points)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from mock_server import MockServer
+from pycampbellcloud import AdaptiveLimiter, RequestScheduler, Transport
+
+
+def fan_out(server: MockServer, scheduler: RequestScheduler | None, calls: int, workers: int):
+    transport = Transport(pool_maxsize=workers, scheduler=scheduler)
+    with server.client(transport=transport) as client:
+        client.get_organization_plan()
+        server.reset_stats()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda i: client.get_station_state(f"st-{i % 50:04d}"), range(calls)))
+        elapsed = time.perf_counter() - start
+    transport.close()
+    failed = sum(1 for result in results if "status" not in result)
+    return failed, elapsed
+
+
+def replay_script():
+    # A scripted burst of throttling: Retry-After is honoured and idempotent reads succeed after retrying
+    with MockServer() as server:
+        scheduler = RequestScheduler(max_retries=4, backoff_base=0.01)
+        transport = Transport(scheduler=scheduler)
+        with server.client(transport=transport) as client:
+            client.get_organization_plan()
+            server.throttle([429, 429, 503], retry_after=0.05)
+            start = time.perf_counter()
+            result = client.get_station("st-0001")
+            elapsed = time.perf_counter() - start
+            server.throttle([429])
+            create = client.create_station({"name": "not retried"})
+        transport.close()
+        print(f"scripted replay: result={result} after {elapsed * 1e3:.0f} ms, stats={scheduler.stats()}")
+        print(f"non-idempotent POST is not retried: {create}")
+
+
+def capacity(calls: int=600, workers: int=32, server_capacity: int=6):
+    with MockServer(latency=0.005, max_in_flight=server_capacity) as server:
+        failed, elapsed = fan_out(server, None, calls, workers)
+        print(f"{'no scheduler':<16} failed={failed:<5} statuses={server.status_counts} {elapsed:.2f}s")
+        scheduler = RequestScheduler(max_retries=8, backoff_base=0.01, backoff_max=0.5,
+                                     limiter=AdaptiveLimiter(initial=workers, maximum=workers))
+        failed, elapsed = fan_out(server, scheduler, calls, workers)
+        print(f"{'AIMD scheduler':<16} failed={failed:<5} statuses={server.status_counts} {elapsed:.2f}s "
+              f"stats={scheduler.stats()}")
+
+
+if __name__ == "__main__":
+    replay_script()
+    capacity()
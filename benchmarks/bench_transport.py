@@ -0,0 +1,33 @@
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from mock_server import MockServer
+from pycampbellcloud import Transport
+
+
+def run(server: MockServer, label: str, transport: Transport, calls: int, workers: int):
+    with server.client(transport=transport) as client:
+        client.get_organization_plan()
+        server.reset_stats()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(lambda i: client.get_station(f"st-{i % 50:04d}"), range(calls)))
+        elapsed = time.perf_counter() - start
+    transport.close()
+    print(f"{label:<24} calls={server.requests:<6} connections={server.connections:<6} "
+          f"calls/connection={server.requests / max(server.connections, 1):<8.1f} "
+          f"calls/s={calls / elapsed:.0f}")
+
+
+def main(calls: int=2000, workers: int=8):
+    with MockServer() as server:
+        run(server, "new connection per call", Transport(keep_alive=False), calls, workers)
+        run(server, "pooled keep-alive", Transport(pool_maxsize=workers), calls, workers)
+
+
+if __name__ == "__main__":
+    main()
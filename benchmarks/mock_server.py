@@ -0,0 +1,542 @@
+import hashlib
+import json
+import math
+import multiprocessing
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+API_PREFIX = "/api/v1/"
+
+
+class MockData:
+
+    def __init__(self, organizations: int=3, datastreams: int=500, stations: int=50, assets: int=50,
+                 points: int=100_000, interval: int=60_000, origin: int=1_700_000_000_000, export_files: int=3,
+                 export_file_size: int=1 << 20, export_polls: int=3):
+        self.organizations = [{"id": f"org-{index}", "name": f"Organization {index}"} for index in range(organizations)]
+        self.datastreams = [{"id": f"ds-{index:05d}", "alias": f"alias-{index:05d}",
+                             "station_id": f"st-{index % stations:04d}", "asset_id": f"as-{index % assets:04d}",
+                             "metadata": {"field": f"field_{index}", "table": "Table1"}}
+                            for index in range(datastreams)]
+        self._datastream_index = {}
+        for index, datastream in enumerate(self.datastreams):
+            self._datastream_index[datastream["id"]] = index
+            self._datastream_index[datastream["alias"]] = index
+        self.stations = [{"id": f"st-{index:04d}", "metadata": {"name": f"Station {index}"}} for index in range(stations)]
+        self.assets = [{"id": f"as-{index:04d}", "metadata": {"serial": f"{10000 + index}"}} for index in range(assets)]
+        self.states = {record["id"]: {"status": "online", "last_seen": origin} for record in self.stations + self.assets}
+        self.points = points
+        self.interval = interval
+        self.origin = origin
+        self.exports = {"exp-0": {"id": "exp-0", "jobs": {"job-0": {"id": "job-0", "status": "complete", "files": {
+            f"file-{index}": {"id": f"file-{index}", "name": f"export_{index}.csv", "size": export_file_size}
+            for index in range(export_files)}}}}}
+        self.export_polls = export_polls
+        self.alert_events = []
+        self._lock = threading.Lock()
+        self._created = 0
+
+    @property
+    def end_epoch(self):
+        return self.origin + (self.points - 1) * self.interval
+
+    def datastream(self, key: str):
+        index = self._datastream_index.get(key)
+        return None if index is None else self.datastreams[index]
+
+    def datapoint_range(self, key: str, start_epoch: int, end_epoch: int):
+        first = max(0, math.ceil((start_epoch - self.origin) / self.interval))
+        last = min(self.points - 1, math.floor((end_epoch - self.origin) / self.interval))
+        return first, last
+
+    def datapoints(self, key: str, start_epoch: int, end_epoch: int, limit: int):
+        seed = self._datastream_index[key]
+        first, last = self.datapoint_range(key, start_epoch, end_epoch)
+        last = min(last, first + limit - 1)
+        return [{"ts": self.origin + step * self.interval, "value": round(((seed * 7 + step) % 1000) * 0.1, 1)}
+                for step in range(first, last + 1)]
+
+    def count(self, key: str, start_epoch: int, end_epoch: int):
+        first, last = self.datapoint_range(key, start_epoch, end_epoch)
+        return max(0, last - first + 1)
+
+    def set_state(self, record_id: str, **state):
+        with self._lock:
+            self.states[record_id] = dict(self.states[record_id], **state)
+
+    def raise_alert(self, alert_filter: str, timestamp: int=None, **fields):
+        with self._lock:
+            record = dict(fields, id=f"evt-{len(self.alert_events)}", filter=alert_filter,
+                          timestamp=int(time.time() * 1000) if timestamp is None else timestamp)
+            self.alert_events.append(record)
+            return record
+
+    def alerts(self, alert_filter: str, start_epoch: int, end_epoch: int):
+        with self._lock:
+            return [record for record in self.alert_events if (not alert_filter or record["filter"] == alert_filter)
+                    and start_epoch <= record["timestamp"] <= end_epoch]
+
+    def create(self, kind: str, body: dict):
+        with self._lock:
+            self._created += 1
+            record = dict(body or {}, id=f"{kind}-new-{self._created}")
+            if kind == "exports":
+                # New export jobs report "running" for a few polls before completing
+                template = self.exports["exp-0"]["jobs"]["job-0"]
+                self.exports[record["id"]] = {"id": record["id"], "jobs": {"job-0": dict(
+                    template, status="running", polls_left=self.export_polls)}}
+            return record
+
+    def poll_job(self, job: dict):
+        with self._lock:
+            if job.get("polls_left"):
+                job["polls_left"] -= 1
+                job["progress"] = 1 - job["polls_left"] / self.export_polls
+                if not job["polls_left"]:
+                    job["status"] = "complete"
+            return {"id": job["id"], "status": job["status"], "progress": job.get("progress", 1.0)}
+
+    def export_file_bytes(self, file_id: str, start: int, end: int):
+        # Deterministic content so downloads can be verified
+        pattern = hashlib.sha256(file_id.encode()).hexdigest().encode()
+        offset = start % len(pattern)
+        repeat = (end - start + offset) // len(pattern) + 1
+        return (pattern * repeat)[offset:offset + end - start]
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    routes = [
+        ("GET", r"__stats", "stats"),
+        ("POST", r"__reset", "reset"),
+        ("POST", r"tokens", "token"),
+        ("PUT", r"tokens", "token"),
+        ("GET", r"organizations", "list_organizations"),
+        ("GET", r"libraries/measurement-conversions/[^/]+/[^/]+/[^/]+", "conversion"),
+        ("GET", r"organizations/[^/]+/datastreams", "list_datastreams"),
+        ("GET", r"organizations/[^/]+/datastreams/count", "count_datastreams"),
+        ("GET", r"organizations/[^/]+/datastreams/labels", "list_labels"),
+        ("GET", r"organizations/[^/]+/datastreams/(?P<id>[^/]+)", "get_datastream"),
+        ("GET", r"organizations/[^/]+/datastreams/(?P<id>[^/]+)/datapoints", "get_datastream_datapoints"),
+        ("GET", r"organizations/[^/]+/datastreams/(?P<id>[^/]+)/datapoints/last", "get_datastream_last"),
+        ("GET", r"organizations/[^/]+/datastreams/(?P<id>[^/]+)/datapoints/count", "get_datastream_count"),
+        ("GET", r"organizations/[^/]+/datapoints", "get_datapoints"),
+        ("GET", r"organizations/[^/]+/(?P<kind>stations|assets)", "list_records"),
+        ("POST", r"organizations/[^/]+/(?P<kind>stations|assets)", "create_record"),
+        ("GET", r"organizations/[^/]+/(?P<kind>stations|assets)/(?P<id>[^/]+)", "get_record"),
+        ("GET", r"organizations/[^/]+/(?P<kind>stations|assets)/(?P<id>[^/]+)/state", "get_state"),
+        ("GET", r"organizations/[^/]+/(?P<kind>alert-events|alert-logs)", "list_alerts"),
+        ("GET", r"organizations/[^/]+/exports", "list_exports"),
+        ("POST", r"organizations/[^/]+/exports", "create_export"),
+        ("GET", r"organizations/[^/]+/exports/(?P<export>[^/]+)", "get_export"),
+        ("GET", r"organizations/[^/]+/exports/(?P<export>[^/]+)/jobs", "list_export_jobs"),
+        ("GET", r"organizations/[^/]+/exports/(?P<export>[^/]+)/jobs/(?P<job>[^/]+)", "get_export_job"),
+        ("GET", r"organizations/[^/]+/exports/(?P<export>[^/]+)/jobs/(?P<job>[^/]+)/files", "list_export_files"),
+        ("GET", r"organizations/[^/]+/exports/(?P<export>[^/]+)/jobs/(?P<job>[^/]+)/files/(?P<file>[^/]+)",
+         "get_export_file"),
+    ]
+    compiled_routes = [(method, re.compile(pattern + "/?$"), name) for method, pattern, name in routes]
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def data(self) -> MockData:
+        return self.server.data
+
+    def _send_bytes(self, status: int, payload: bytes, headers: dict=None, content_type: str="application/json"):
+        if self.command == "GET" and status == 200:
+            etag = f'"{hashlib.sha1(payload).hexdigest()}"'
+            headers = dict(headers or {}, ETag=etag)
+            if self.headers.get("If-None-Match") == etag:
+                status, payload = 304, b""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        # Counted before the write so the stats already include a request once its client has the response
+        if not self.path.startswith("/__"):
+            self.server.count_request(len(payload), status)
+        self.wfile.write(payload)
+
+    def _send_json(self, status: int, body, headers: dict=None):
+        self._send_bytes(status, json.dumps(body).encode(), headers)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def _admit(self):
+        status, retry_after = self.server.admit(self.path)
+        if status is None:
+            return True
+        self._read_body()
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else {}
+        self._send_json(status, {"message": "Too Many Requests" if status == 429 else "Service Unavailable"}, headers)
+        return False
+
+    def _authorized(self):
+        if self.server.authorize(self.path, self.headers.get("Authorization")):
+            return True
+        self._read_body()
+        self._send_json(401, {"message": "Unauthorized"})
+        return False
+
+    def _dispatch(self):
+        if not self._authorized() or not self._admit():
+            return
+        try:
+            if self.server.latency:
+                time.sleep(self.server.latency)
+            url = urlsplit(self.path)
+            body = self._read_body()
+            # list_datastreams sends its paging parameters as a JSON body on a GET
+            params = dict(body) if self.command == "GET" and isinstance(body, dict) else {}
+            params.update(parse_qsl(url.query))
+            path = url.path[len(API_PREFIX):] if url.path.startswith(API_PREFIX) else url.path.lstrip("/")
+            for method, pattern, name in self.compiled_routes:
+                match = pattern.match(path) if method == self.command else None
+                if match:
+                    return getattr(self, f"route_{name}")(params, body, **match.groupdict())
+            self.route_default(params, body)
+        finally:
+            self.server.release()
+
+    do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+    def route_default(self, params, body):
+        if self.command == "DELETE":
+            self._send_json(204, {})
+        else:
+            self._send_json(201 if self.command == "POST" else 200, {"path": self.path})
+
+    def route_stats(self, params, body):
+        self._send_json(200, self.server.stats())
+
+    def route_reset(self, params, body):
+        self.server.reset_stats()
+        self._send_json(200, {})
+
+    def route_token(self, params, body):
+        body = body if isinstance(body, dict) else {}
+        grant_type = "refresh_token" if self.command == "PUT" else body.get("grant_type", "password")
+        token = self.server.grant_token(grant_type, body)
+        if token is None:
+            return self._send_json(401, {"message": "Unauthorized"})
+        self._send_json(200, token)
+
+    def route_list_organizations(self, params, body):
+        self._send_json(200, self.data.organizations)
+
+    def route_conversion(self, params, body):
+        self._send_json(200, {"multiplier": 1.8, "offset": 32.0})
+
+    def route_list_datastreams(self, params, body):
+        limit, offset = int(params.get("limit") or 100), int(params.get("offset") or 0)
+        records = self.data.datastreams
+        for key, field in (("stationID", "station_id"), ("assetID", "asset_id")):
+            if params.get(key):
+                records = [record for record in records if record[field] == params[key]]
+        self._send_json(200, records[offset:offset + limit])
+
+    def route_count_datastreams(self, params, body):
+        self._send_json(200, {"count": len(self.data.datastreams)})
+
+    def route_list_labels(self, params, body):
+        limit = int(params.get("limit") or 1000)
+        labels = [record["alias"] for record in self.data.datastreams]
+        start = labels.index(params["startAfter"]) + 1 if params.get("startAfter") in labels else 0
+        self._send_json(200, labels[start:start + limit])
+
+    def route_get_datastream(self, params, body, id):
+        record = self.data.datastream(id)
+        self._send_json(200 if record else 404, record or {"message": "Not Found"})
+
+    def _epochs(self, params):
+        return int(params.get("startEpoch") or 0), int(params.get("endEpoch") or self.data.end_epoch)
+
+    def route_get_datastream_datapoints(self, params, body, id):
+        if self.data.datastream(id) is None:
+            return self._send_json(404, {"message": "Not Found"})
+        start_epoch, end_epoch = self._epochs(params)
+        limit = int(params.get("limit") or 100)
+        self._send_json(200, {"datastream_id": id, "data": self.data.datapoints(id, start_epoch, end_epoch, limit)})
+
+    def route_get_datastream_last(self, params, body, id):
+        if self.data.datastream(id) is None:
+            return self._send_json(404, {"message": "Not Found"})
+        end_epoch = self.data.end_epoch
+        self._send_json(200, {"datastream_id": id, "data": self.data.datapoints(id, end_epoch, end_epoch, 1)})
+
+    def route_get_datastream_count(self, params, body, id):
+        self._send_json(200, {"count": self.data.count(id, *self._epochs(params))})
+
+    def route_get_datapoints(self, params, body):
+        start_epoch, end_epoch = self._epochs(params)
+        limit = int(params.get("limit") or self.server.max_points)
+        aliases = [alias for alias in (params.get("aliases") or "").split(",") if self.data.datastream(alias)]
+        self._send_json(200, [{"datastream_id": self.data.datastream(alias)["id"], "alias": alias,
+                               "data": self.data.datapoints(alias, start_epoch, end_epoch, limit)}
+                              for alias in aliases])
+
+    def route_list_records(self, params, body, kind):
+        self._send_json(200, getattr(self.data, kind))
+
+    def route_create_record(self, params, body, kind):
+        self._send_json(201, self.data.create(kind, body))
+
+    def route_get_record(self, params, body, kind, id):
+        record = next((record for record in getattr(self.data, kind) if record["id"] == id), None)
+        self._send_json(200 if record else 404, record or {"message": "Not Found"})
+
+    def route_get_state(self, params, body, kind, id):
+        state = self.data.states.get(id)
+        self._send_json(200 if state else 404, state or {"message": "Not Found"})
+
+    def route_list_alerts(self, params, body, kind):
+        # Alert events are served in pages of 100, alert logs honour limit
+        start_epoch, end_epoch = int(params.get("startEpoch") or 0), int(params.get("endEpoch") or time.time() * 1000)
+        offset, limit = int(params.get("offset") or 0), int(params.get("limit") or 100)
+        records = self.data.alerts(params.get("filter"), start_epoch, end_epoch)
+        self._send_json(200, records[offset:offset + limit])
+
+    def route_list_exports(self, params, body):
+        self._send_json(200, [{"id": export["id"]} for export in self.data.exports.values()])
+
+    def route_create_export(self, params, body):
+        self._send_json(201, self.data.create("exports", body))
+
+    def route_get_export(self, params, body, export):
+        self._send_json(200, {"id": export})
+
+    def route_list_export_jobs(self, params, body, export):
+        jobs = self.data.exports.get(export, {}).get("jobs", {})
+        self._send_json(200, [self.data.poll_job(job) for job in jobs.values()])
+
+    def _job(self, export, job):
+        return self.data.exports.get(export, {}).get("jobs", {}).get(job)
+
+    def route_get_export_job(self, params, body, export, job):
+        record = self._job(export, job)
+        if record is None:
+            return self._send_json(404, {"message": "Not Found"})
+        self._send_json(200, self.data.poll_job(record))
+
+    def route_list_export_files(self, params, body, export, job):
+        record = self._job(export, job)
+        self._send_json(200 if record else 404, list(record["files"].values()) if record else {"message": "Not Found"})
+
+    def route_get_export_file(self, params, body, export, job, file):
+        record = self._job(export, job)
+        metadata = record["files"].get(file) if record else None
+        if metadata is None:
+            return self._send_json(404, {"message": "Not Found"})
+        size = metadata["size"]
+        match = re.match(r"bytes=(\d+)-(\d*)$", self.headers.get("Range") or "")
+        if match is None:
+            return self._send_bytes(200, self.data.export_file_bytes(file, 0, size), {"Accept-Ranges": "bytes"},
+                                    content_type="text/csv")
+        start, end = int(match.group(1)), int(match.group(2) or size - 1) + 1
+        if start >= size:
+            return self._send_bytes(416, b"", {"Content-Range": f"bytes */{size}"}, content_type="text/csv")
+        end = min(end, size)
+        self._send_bytes(206, self.data.export_file_bytes(file, start, end),
+                         {"Content-Range": f"bytes {start}-{end - 1}/{size}", "Accept-Ranges": "bytes"},
+                         content_type="text/csv")
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, host: str="127.0.0.1", port: int=0, handler=MockHandler, data: MockData=None,
+                 latency: float=0.0, max_in_flight: int=None, retry_after: float=None, max_points: int=10_000,
+                 authenticate: bool=False, token_lifetime: float=3600.0):
+        super().__init__((host, port), handler)
+        self.data = MockData() if data is None else data
+        self.latency = latency
+        self.max_in_flight = max_in_flight
+        self.retry_after = retry_after
+        self.max_points = max_points
+        self.authenticate = authenticate
+        self.token_lifetime = token_lifetime
+        self._stats_lock = threading.Lock()
+        self._access_tokens = {}
+        self._refresh_tokens = set()
+        self.token_requests = []
+        self._throttle_script = deque()
+        self._in_flight = 0
+        self.connections = 0
+        self.requests = 0
+        self.bytes_sent = 0
+        self.status_counts = {}
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self):
+        return f"{self.url}{API_PREFIX}"
+
+    def client(self, organization_id: str="org-0", **kwargs):
+        from pycampbellcloud import CampbellCloud
+        return CampbellCloud(organization_id, "mock-user", "mock-password", api_url=self.api_url, **kwargs)
+
+    def throttle(self, statuses, retry_after: float=None):
+        # Replays the given status codes, one per request, before serving normally again
+        with self._stats_lock:
+            self._throttle_script.extend((status, retry_after) for status in statuses)
+
+    def grant_token(self, grant_type: str, body: dict):
+        # Every grant issues a fresh pair, with authenticate on only the mock credentials or a live refresh token pass
+        with self._stats_lock:
+            self.token_requests.append(grant_type)
+            if self.authenticate:
+                if grant_type == "refresh_token" and body.get("refresh_token") not in self._refresh_tokens:
+                    return None
+                if grant_type != "refresh_token" and (body.get("username"), body.get("password")) != \
+                        ("mock-user", "mock-password"):
+                    return None
+            index = len(self.token_requests)
+            access_token, refresh_token = f"mock-token-{index}", f"mock-refresh-{index}"
+            self._access_tokens[access_token] = time.monotonic() + self.token_lifetime
+            self._refresh_tokens.add(refresh_token)
+            return {"access_token": access_token, "refresh_token": refresh_token, "expires_in": self.token_lifetime}
+
+    def authorize(self, path: str, authorization: str | None):
+        # Only checked with authenticate on: a bearer token must have been issued and not have expired or been revoked
+        if not self.authenticate or path.startswith((f"{API_PREFIX}tokens", "/__")):
+            return True
+        token = (authorization or "").removeprefix("Bearer ")
+        with self._stats_lock:
+            expires_at = self._access_tokens.get(token)
+        return expires_at is not None and time.monotonic() < expires_at
+
+    def revoke_tokens(self, refresh: bool=False):
+        # Every issued access token, and the refresh tokens too when refresh is set, is rejected from now on
+        with self._stats_lock:
+            self._access_tokens.clear()
+            if refresh:
+                self._refresh_tokens.clear()
+
+    def admit(self, path: str):
+        with self._stats_lock:
+            if not path.startswith((f"{API_PREFIX}tokens", "/__")):
+                if self._throttle_script:
+                    status, retry_after = self._throttle_script.popleft()
+                    if status >= 400:
+                        return status, retry_after
+                elif self.max_in_flight is not None and self._in_flight >= self.max_in_flight:
+                    return 429, self.retry_after
+            self._in_flight += 1
+            return None, None
+
+    def release(self):
+        with self._stats_lock:
+            self._in_flight -= 1
+
+    def process_request(self, request, client_address):
+        with self._stats_lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+    def count_request(self, size: int, status: int=200):
+        with self._stats_lock:
+            self.requests += 1
+            self.bytes_sent += size
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.connections = 0
+            self.requests = 0
+            self.bytes_sent = 0
+            self.status_counts = {}
+
+    def stats(self):
+        with self._stats_lock:
+            return {"connections": self.connections, "requests": self.requests, "bytes_sent": self.bytes_sent,
+                    "status_counts": dict(self.status_counts)}
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def _serve(ready, data_options: dict, options: dict):
+    server = MockServer(data=MockData(**data_options), **options)
+    ready.put(server.server_address[:2])
+    server.serve_forever()
+
+
+class MockServerProcess:
+    # Runs the stand-in server in a child process so it does not share the benchmark's GIL or memory accounting
+
+    def __init__(self, data_options: dict=None, **options):
+        self.data_options = data_options or {}
+        self.options = options
+        self._process = None
+        self.url = None
+
+    @property
+    def api_url(self):
+        return f"{self.url}{API_PREFIX}"
+
+    def client(self, organization_id: str="org-0", **kwargs):
+        from pycampbellcloud import CampbellCloud
+        return CampbellCloud(organization_id, "mock-user", "mock-password", api_url=self.api_url, **kwargs)
+
+    def stats(self):
+        return requests.get(f"{self.url}/__stats", timeout=10).json()
+
+    def reset_stats(self):
+        requests.post(f"{self.url}/__reset", timeout=10)
+
+    def start(self):
+        ready = multiprocessing.Queue()
+        self._process = multiprocessing.Process(target=_serve, args=(ready, self.data_options, self.options), daemon=True)
+        self._process.start()
+        host, port = ready.get(timeout=30)
+        self.url = f"http://{host}:{port}"
+        return self
+
+    def stop(self):
+        self._process.terminate()
+        self._process.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,93 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src"))
+
+from mock_server import MockData, MockServerProcess
+from pycampbellcloud import Transport
+
+
+def scenarios(data: MockData):
+    day = 24 * 60 * 60 * 1000
+    start_epoch = data.end_epoch - day
+    aliases = ",".join(record["alias"] for record in data.datastreams[:10])
+    return {
+        "list_datastreams": lambda client, i: client.list_datastreams(limit=100, offset=(i * 100) % len(data.datastreams)),
+        "get_datastream": lambda client, i: client.get_datastream(data.datastreams[i % len(data.datastreams)]["id"]),
+        "get_datastream_datapoints": lambda client, i: client.get_datastream_datapoints(
+            data.datastreams[i % len(data.datastreams)]["id"], start_epoch, data.end_epoch, limit=1440),
+        "get_datapoints(10 aliases)": lambda client, i: client.get_datapoints(aliases, start_epoch, data.end_epoch),
+        "get_station_state": lambda client, i: client.get_station_state(data.stations[i % len(data.stations)]["id"]),
+        "get_asset": lambda client, i: client.get_asset(data.assets[i % len(data.assets)]["id"]),
+        "list_export_job_files": lambda client, i: client.list_export_job_files("exp-0", "job-0"),
+        "iter_datastreams(all)": lambda client, i: sum(1 for _ in client.iter_datastreams(limit=100)),
+        "range(7 days, 8 workers)": lambda client, i: sum(1 for _ in client.iter_datastream_datapoints_range(
+            data.datastreams[i % len(data.datastreams)]["id"], data.end_epoch - 7 * day, data.end_epoch,
+            max_workers=8, slice_points=1440)),
+    }
+
+
+def run_scenario(server: MockServerProcess, client, call, calls: int, workers: int):
+    latencies = []
+
+    def timed(i):
+        start = time.perf_counter()
+        call(client, i)
+        latencies.append(time.perf_counter() - start)
+
+    server.reset_stats()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(timed, range(calls)))
+    elapsed = time.perf_counter() - start
+    stats = server.stats()
+
+    # Memory is measured in a separate pass, tracemalloc would distort the timings
+    tracemalloc.start()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda i: call(client, i), range(min(calls, workers))))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {"calls/s": calls / elapsed,
+            "p50 ms": statistics.median(latencies) * 1e3,
+            "p99 ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e3,
+            "peak MB": peak / 1e6,
+            "MB sent": stats["bytes_sent"] / 1e6,
+            "requests": stats["requests"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CampbellCloud read paths against a local stand-in server.")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated server latency in seconds.")
+    parser.add_argument("--max-in-flight", type=int, default=None, help="Throttle above this many concurrent requests.")
+    parser.add_argument("--only", nargs="*", help="Run only the named scenarios.")
+    args = parser.parse_args()
+
+    data = MockData()
+    with MockServerProcess(latency=args.latency, max_in_flight=args.max_in_flight) as server:
+        transport = Transport(pool_maxsize=max(args.workers, 8) * 2)
+        with server.client(transport=transport) as client:
+            client.get_organization_plan()
+            print(f"{'scenario':<28}{'calls/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'peak MB':>10}{'MB sent':>10}"
+                  f"{'requests':>10}")
+            for name, call in scenarios(data).items():
+                if args.only and name not in args.only:
+                    continue
+                calls = args.calls if "(" not in name else max(1, args.calls // 20)
+                result = run_scenario(server, client, call, calls, args.workers)
+                print(f"{name:<28}" + "".join(f"{value:>10.1f}" if isinstance(value, float) else f"{value:>10}"
+                                              for value in result.values()))
+        transport.close()
+
+
+if __name__ == "__main__":
+    main()
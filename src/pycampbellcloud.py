@@ -1,354 +1,2358 @@
+import asyncio
+import bisect
+import codecs
+import contextlib
+import functools
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote_plus, urlencode, urlsplit
+
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import JSONDecodeError
 
-# Wrapper setup
-def request_wrapper(func):
-    def wrapper(*args, **kwargs):
-        results = func(*args, **kwargs)
-        if results is None:
-            return {'status': 'Results is type None'}
-        elif results.status_code == 304:
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+DEFAULT_API_URL = "https://us-west-2.campbell-cloud.com/api/v1/"
+
+
+# Cache setup
+# Measurement libraries, parts, the organization plan and data collection types change rarely enough to cache
+NEAR_STATIC_PATHS = r"/libraries/|/plan/?$|/data-collections/types/?$"
+
+
+class ResponseCache:
+
+    def __init__(self, max_entries: int=256, ttl: float=0.0, max_bytes: int=32 << 20, max_entry_bytes: int=1 << 20,
+                 paths: str | None=NEAR_STATIC_PATHS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._paths = re.compile(paths) if paths else None
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "revalidated": 0, "evictions": 0, "invalidations": 0}
+
+    @staticmethod
+    def key(url: str, params=None, headers=None, body=None):
+        # Requests differing in query, body (list_datastreams pages through a JSON body) or caller never share a key
+        if params:
+            items = params.items() if isinstance(params, dict) else params
+            query = urlencode(sorted((k, str(v)) for k, v in items if v is not None))
+            if query:
+                url = f"{url}?{query}"
+        if body is not None and not isinstance(body, (str, bytes)):
+            body = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+        return url, body, (headers or {}).get("Authorization")
+
+    def cacheable(self, url: str):
+        return self._paths is None or self._paths.search(urlsplit(url).path) is not None
+
+    def lookup(self, key: tuple):
+        # Returns (fresh response or None, stale entry or None)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None, None
+            self._entries.move_to_end(key)
+            if self.ttl and time.monotonic() - entry["stored_at"] < self.ttl:
+                self._stats["hits"] += 1
+                return entry["response"], entry
+            return None, entry
+
+    def validators(self, entry: dict):
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def revalidated(self, key: tuple, entry: dict):
+        with self._lock:
+            entry["stored_at"] = time.monotonic()
+            self._stats["revalidated"] += 1
+            self._stats["hits"] += 1
+        return entry["response"]
+
+    def store(self, key: tuple, response):
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        size = len(response.content)
+        with self._lock:
+            self._discard(key)
+            if not (etag or last_modified or self.ttl) or size > self.max_entry_bytes:
+                return
+            self._entries[key] = {"response": response, "etag": etag, "last_modified": last_modified, "size": size,
+                                  "stored_at": time.monotonic(), "path": urlsplit(key[0]).path.rstrip("/")}
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def _discard(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry["size"]
+
+    def invalidate(self, url: str):
+        # A write invalidates the resource itself, its sub-resources and the collections above it
+        path = urlsplit(url).path.rstrip("/")
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if entry["path"].startswith(path) or path.startswith(entry["path"] + "/")]
+            for key in stale:
+                self._discard(key)
+            self._stats["invalidations"] += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes)
+
+
+# Coalescing setup
+class RequestCoalescer:
+    # Identical GETs that overlap wait on the response of the first one instead of going to the network
+
+    def __init__(self, window: float=0.0, window_pattern: str | None=r"/datapoints/last/?$", max_entries: int=1024):
+        self.window = window
+        self.max_entries = max_entries
+        self._window_pattern = re.compile(window_pattern) if window_pattern else None
+        self._in_flight = {}
+        self._recent = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"sent": 0, "coalesced": 0, "window_hits": 0}
+
+    @staticmethod
+    def key(url: str, params=None, headers=None, body=None):
+        # Callers authenticated differently, or asking for different bodies, never share a response
+        return ResponseCache.key(url, params, headers, body)
+
+    def get(self, key: tuple, send):
+        with self._lock:
+            recent = self._recent.get(key)
+            if recent is not None:
+                if time.monotonic() - recent[0] < self.window:
+                    self._stats["window_hits"] += 1
+                    return recent[1]
+                del self._recent[key]
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                self._stats["sent"] += 1
+            else:
+                self._stats["coalesced"] += 1
+        if not leader:
+            return future.result()
+        try:
+            response = send()
+        except BaseException as error:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(error)
+            raise
+        with self._lock:
+            del self._in_flight[key]
+            if self.window and response.status_code == 200 and self._windowed(key[0]):
+                # Hot reads such as the last datapoint are reused for a short window after they complete
+                self._recent[key] = (time.monotonic(), response)
+                while len(self._recent) > self.max_entries:
+                    self._recent.popitem(last=False)
+        future.set_result(response)
+        return response
+
+    def _windowed(self, url: str):
+        return self._window_pattern is None or self._window_pattern.search(urlsplit(url).path) is not None
+
+    def invalidate(self, url: str):
+        path = urlsplit(url).path.rstrip("/")
+        with self._lock:
+            for key in [key for key in self._recent if urlsplit(key[0]).path.rstrip("/").startswith(path)]:
+                del self._recent[key]
+
+    def clear(self):
+        with self._lock:
+            self._recent.clear()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._in_flight), recent=len(self._recent))
+
+
+# Scheduler setup
+def endpoint_family(url: str):
+    parts = [part for part in urlsplit(url).path.split("/") if part]
+    if "organizations" in parts:
+        parts = parts[parts.index("organizations") + 2:]
+    elif "v1" in parts:
+        parts = parts[parts.index("v1") + 1:]
+    return parts[0] if parts else ""
+
+def retry_after_seconds(value: str | None):
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+
+    def __init__(self, rate: float, capacity: float=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+
+class AdaptiveLimiter:
+    # Additive increase of one slot per window of successes, multiplicative decrease on throttling
+
+    def __init__(self, initial: int=8, minimum: int=1, maximum: int=64, decrease: float=0.5):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self):
+        return int(self._limit)
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def acquire(self):
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    def on_success(self):
+        with self._condition:
+            self._limit = min(self.maximum, self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+    def on_throttle(self):
+        with self._condition:
+            self._limit = max(self.minimum, self._limit * self.decrease)
+
+
+class RequestScheduler:
+
+    def __init__(self, max_retries: int=3, backoff_base: float=0.5, backoff_max: float=30.0,
+                 retry_statuses: tuple=(429, 500, 502, 503, 504), throttle_statuses: tuple=(429, 503),
+                 idempotent_methods: tuple=("GET", "HEAD", "OPTIONS", "PUT", "DELETE"),
+                 limiter: AdaptiveLimiter=None, rate_limits: dict=None, default_rate_limit: tuple=None):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = retry_statuses
+        self.throttle_statuses = throttle_statuses
+        self.idempotent_methods = idempotent_methods
+        self.limiter = AdaptiveLimiter() if limiter is None else limiter
+        self._rate_limits = {family: TokenBucket(*limit) for family, limit in (rate_limits or {}).items()}
+        self._default_rate_limit = default_rate_limit
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "throttled": 0, "errors": 0}
+
+    def bucket(self, family: str):
+        bucket = self._rate_limits.get(family)
+        if bucket is None and self._default_rate_limit is not None:
+            with self._lock:
+                bucket = self._rate_limits.setdefault(family, TokenBucket(*self._default_rate_limit))
+        return bucket
+
+    def backoff(self, attempt: int, response=None):
+        retry_after = retry_after_seconds(response.headers.get("Retry-After")) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def send(self, method: str, url: str, send):
+        retryable = method.upper() in self.idempotent_methods
+        bucket = self.bucket(endpoint_family(url))
+        attempt = 0
+        while True:
+            if bucket is not None:
+                bucket.acquire()
+            self.limiter.acquire()
             try:
-                json_result = results.json()
-                return json_result
-            except JSONDecodeError:
-                return {'message': 'No metadata fields provided for update'}
-        elif results.status_code == 204:
+                self._count("requests")
+                response = send()
+            except requests.ConnectionError:
+                self._count("errors")
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                response = None
+            finally:
+                self.limiter.release()
+            if response is not None:
+                if response.status_code in self.throttle_statuses:
+                    self._count("throttled")
+                    self.limiter.on_throttle()
+                else:
+                    self.limiter.on_success()
+                if response.status_code not in self.retry_statuses or not retryable or attempt >= self.max_retries:
+                    return response
+                response.close()
+            self._count("retries")
+            time.sleep(self.backoff(attempt, response))
+            attempt += 1
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, limit=self.limiter.limit, in_flight=self.limiter.in_flight)
+
+
+# Transport setup
+class Transport:
+
+    def __init__(self, pool_connections: int=10, pool_maxsize: int=10, pool_block: bool=False,
+                 keep_alive: bool=True, timeout: float | tuple=(5, 30), max_retries: int=0,
+                 cache: ResponseCache=None, scheduler: RequestScheduler=None, coalescer: RequestCoalescer=None):
+        self.timeout = timeout
+        self.cache = cache
+        self.scheduler = scheduler
+        self.coalescer = coalescer
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                              max_retries=max_retries, pool_block=pool_block)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        if not keep_alive:
+            self._session.headers["Connection"] = "close"
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+
+    @property
+    def closed(self):
+        return self._closed
+
+    @contextlib.contextmanager
+    def streaming(self):
+        # Requests made by this thread inside the block return unread, streamed responses
+        self._local.stream = True
+        try:
+            yield self
+        finally:
+            self._local.stream = False
+
+    def request(self, method: str, url: str, **kwargs):
+        if self._closed:
+            raise RuntimeError("Transport is closed.")
+        kwargs.setdefault("timeout", self.timeout)
+        if getattr(self._local, "stream", False):
+            kwargs["stream"] = True
+        if self.cache is None and self.coalescer is None:
+            return self._send(method, url, **kwargs)
+        if method.upper() != "GET" or kwargs.get("stream"):
+            response = self._send(method, url, **kwargs)
+            if method.upper() in ("POST", "PUT", "PATCH", "DELETE"):
+                if self.cache is not None:
+                    self.cache.invalidate(url)
+                if self.coalescer is not None:
+                    self.coalescer.invalidate(url)
+            return response
+        if self.coalescer is None:
+            if not self.cache.cacheable(url):
+                return self._send("GET", url, **kwargs)
+            return self._cached_get(url, **kwargs)
+        key = self.coalescer.key(url, kwargs.get("params"), kwargs.get("headers"),
+                                 kwargs.get("json", kwargs.get("data")))
+        if self.cache is None or not self.cache.cacheable(url):
+            return self.coalescer.get(key, lambda: self._send("GET", url, **kwargs))
+        return self.coalescer.get(key, lambda: self._cached_get(url, **kwargs))
+
+    def _cached_get(self, url: str, **kwargs):
+        key = self.cache.key(url, kwargs.get("params"), kwargs.get("headers"), kwargs.get("json", kwargs.get("data")))
+        response, entry = self.cache.lookup(key)
+        if response is not None:
+            return response
+        if entry is not None:
+            kwargs["headers"] = dict(kwargs.get("headers") or {}, **self.cache.validators(entry))
+        response = self._send("GET", url, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            return self.cache.revalidated(key, entry)
+        if response.status_code == 200:
+            self.cache.store(key, response)
+        return response
+
+    def _send(self, method: str, url: str, **kwargs):
+        if self.scheduler is None:
+            return self._session.request(method, url, **kwargs)
+        return self.scheduler.send(method, url, lambda: self._session.request(method, url, **kwargs))
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def options(self, url: str, **kwargs):
+        return self.request("OPTIONS", url, **kwargs)
+
+    def close(self):
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Pagination setup
+def page_records(page):
+    if isinstance(page, list):
+        return page
+    if isinstance(page, dict):
+        for value in page.values():
+            if isinstance(value, list):
+                return value
+    return []
+
+class ResponseError(RuntimeError):
+    # Raised when an endpoint answered with an error body where data was expected
+
+    def __init__(self, message: str, result=None):
+        super().__init__(message)
+        self.result = result
+
+
+def is_page(result):
+    # Error bodies decode to plain objects, pages are lists or objects holding a list
+    return isinstance(result, list) or (isinstance(result, dict) and
+                                        any(isinstance(value, list) for value in result.values()))
+
+def record_cursor(record, *keys):
+    if not isinstance(record, dict):
+        return record
+    for key in keys:
+        if record.get(key) is not None:
+            return record[key]
+    return None
+
+def iter_pages(fetch_page, cursor, next_cursor):
+    # next_cursor(cursor, records) returns None once the last page has been reached
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="campbellcloud-prefetch") as prefetcher:
+        pending = prefetcher.submit(fetch_page, cursor)
+        try:
+            while pending is not None:
+                page = pending.result()
+                if not is_page(page):
+                    raise ResponseError(f"Page at {cursor!r} could not be fetched: {page}", page)
+                records = page_records(page)
+                cursor = next_cursor(cursor, records) if records else None
+                pending = prefetcher.submit(fetch_page, cursor) if cursor is not None else None
+                yield from records
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+
+# Datapoint setup
+def datapoint_records(result):
+    if isinstance(result, dict) and isinstance(result.get("data"), list):
+        return result["data"]
+    return page_records(result)
+
+def datapoint_timestamp(point):
+    if isinstance(point, dict):
+        return point.get("ts", point.get("timestamp"))
+    if isinstance(point, (list, tuple)):
+        return point[0]
+    return None
+
+def datapoint_value(point):
+    value = point.get("value", point.get("v")) if isinstance(point, dict) else point[1]
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+def datapoint_groups(result, default_id: str=None):
+    if isinstance(result, dict) and isinstance(result.get("data"), list):
+        return {record_cursor(result, "datastream_id", "id", "alias") or default_id: result["data"]}
+    if isinstance(result, list) and result and all(isinstance(group, dict) and "data" in group for group in result):
+        groups = {}
+        for group in result:
+            groups.update(datapoint_groups(group, default_id))
+        return groups
+    if isinstance(result, dict) and result and all(isinstance(points, list) for points in result.values()):
+        return dict(result)
+    return {default_id: datapoint_records(result)}
+
+def count_value(result):
+    if isinstance(result, dict):
+        result = result.get("count", 0)
+    return int(result or 0)
+
+def is_count(result):
+    # A count is a bare number or an object carrying one, error bodies are objects without it
+    if isinstance(result, dict):
+        result = result.get("count")
+    return isinstance(result, (int, float)) and not isinstance(result, bool)
+
+
+class DatapointColumns:
+    # Timestamps and values are numpy arrays when numpy is installed and memoryviews over array.array otherwise,
+    # so slicing never copies either way
+
+    def __init__(self, timestamps, values):
+        if len(timestamps) != len(values):
+            raise ValueError("timestamps and values must be the same length.")
+        self._timestamps = timestamps
+        self._values = values
+
+    @classmethod
+    def from_points(cls, points):
+        points = sorted(points, key=datapoint_timestamp)
+        if numpy is not None:
+            timestamps = numpy.fromiter((datapoint_timestamp(point) for point in points), dtype=numpy.int64,
+                                        count=len(points))
+            values = numpy.fromiter((datapoint_value(point) for point in points), dtype=numpy.float64,
+                                    count=len(points))
+            return cls(timestamps, values)
+        timestamps = array("q", (int(datapoint_timestamp(point)) for point in points))
+        values = array("d", (datapoint_value(point) for point in points))
+        return cls(memoryview(timestamps), memoryview(values))
+
+    @property
+    def timestamps(self):
+        return self._timestamps
+
+    @property
+    def values(self):
+        return self._values
+
+    def __len__(self):
+        return len(self._timestamps)
+
+    def __iter__(self):
+        return zip(self._timestamps, self._values)
+
+    def between(self, start_epoch: int=None, end_epoch: int=None):
+        if numpy is not None and isinstance(self._timestamps, numpy.ndarray):
+            lo = 0 if start_epoch is None else int(numpy.searchsorted(self._timestamps, start_epoch, "left"))
+            hi = len(self) if end_epoch is None else int(numpy.searchsorted(self._timestamps, end_epoch, "right"))
+        else:
+            lo = 0 if start_epoch is None else bisect.bisect_left(self._timestamps, start_epoch)
+            hi = len(self) if end_epoch is None else bisect.bisect_right(self._timestamps, end_epoch)
+        return DatapointColumns(self._timestamps[lo:hi], self._values[lo:hi])
+
+    def sum(self):
+        if numpy is not None and isinstance(self._values, numpy.ndarray):
+            return float(numpy.nansum(self._values))
+        total = math.fsum(self._values)
+        if math.isnan(total):
+            total = math.fsum(value for value in self._values if not math.isnan(value))
+        return total
+
+    def mean(self):
+        if numpy is not None and isinstance(self._values, numpy.ndarray):
+            return float(numpy.nanmean(self._values)) if len(self) else math.nan
+        valid = len(self) - sum(map(math.isnan, self._values))
+        return self.sum() / valid if valid else math.nan
+
+    def min(self):
+        if numpy is not None and isinstance(self._values, numpy.ndarray):
+            return float(numpy.nanmin(self._values)) if len(self) else math.nan
+        return min((value for value in self._values if not math.isnan(value)), default=math.nan)
+
+    def max(self):
+        if numpy is not None and isinstance(self._values, numpy.ndarray):
+            return float(numpy.nanmax(self._values)) if len(self) else math.nan
+        return max((value for value in self._values if not math.isnan(value)), default=math.nan)
+
+    def to_points(self):
+        return [{"ts": int(ts), "value": float(value)} for ts, value in self]
+
+
+class DatapointFrame(dict):
+
+    @classmethod
+    def from_response(cls, result, default_id: str=None):
+        return cls({datastream_id: DatapointColumns.from_points(points)
+                    for datastream_id, points in datapoint_groups(result, default_id).items()})
+
+    def between(self, start_epoch: int=None, end_epoch: int=None):
+        return DatapointFrame({datastream_id: columns.between(start_epoch, end_epoch)
+                               for datastream_id, columns in self.items()})
+
+
+class DatapointRangeFetcher:
+
+    def __init__(self, client, max_workers: int=4, slice_points: int=5000, page_limit: int=1000,
+                 ordered: bool=True, max_pending: int=None, brief: bool=True):
+        self._client = client
+        self.max_workers = max_workers
+        self.slice_points = slice_points
+        self.page_limit = page_limit
+        self.ordered = ordered
+        self.max_pending = max_pending or max_workers * 2
+        self.brief = brief
+
+    def plan(self, datastream_id: str, start_epoch: int, end_epoch: int):
+        # Neighbouring slices share their boundary epoch, duplicates are dropped when merging
+        result = self._client.get_datastream_datapoints_count(datastream_id, start_epoch, end_epoch)
+        status_code = self._client.last_status_code
+        if (status_code is not None and status_code >= 400) or not is_count(result):
+            raise ResponseError(f"Datapoints of {datastream_id} could not be counted: {result}", result)
+        count = count_value(result)
+        slice_count = max(1, min(math.ceil(count / self.slice_points), end_epoch - start_epoch))
+        width = (end_epoch - start_epoch) / slice_count
+        bounds = [start_epoch + round(width * index) for index in range(slice_count)] + [end_epoch]
+        return list(zip(bounds, bounds[1:]))
+
+    def fetch_slice(self, datastream_id: str, start_epoch: int, end_epoch: int):
+        points = []
+        last_ts = None
+        while True:
+            result = self._client.get_datastream_datapoints(datastream_id, start_epoch, end_epoch, brief=self.brief,
+                                                            limit=self.page_limit)
+            if not is_page(result):
+                raise ResponseError(f"Datapoints of {datastream_id} from {start_epoch} could not be fetched: {result}",
+                                    result)
+            page = datapoint_records(result)
+            full_page = len(page) >= self.page_limit
+            page = sorted(page, key=datapoint_timestamp)
+            if last_ts is not None:
+                page = [point for point in page if datapoint_timestamp(point) > last_ts]
+            points.extend(page)
+            if not full_page or not page:
+                return points
+            last_ts = datapoint_timestamp(page[-1])
+            start_epoch = last_ts
+
+    def iter_datapoints(self, datastream_id: str, start_epoch: int, end_epoch: int):
+        slices = deque(self.plan(datastream_id, start_epoch, end_epoch))
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="campbellcloud-range") as pool:
+            pending = deque()
+            def submit():
+                while slices and len(pending) < self.max_pending:
+                    pending.append(pool.submit(self.fetch_slice, datastream_id, *slices.popleft()))
             try:
-                json_result = results.json()
-                return json_result
-            except JSONDecodeError:
-                return {'status': 'Success', 'message': 'Response returned a 204 with no content'}
-        elif results.status_code == 200:
+                submit()
+                if self.ordered:
+                    yield from self._merge_ordered(pending, submit)
+                else:
+                    yield from self._merge_completed(pending, submit)
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _merge_ordered(self, pending, submit):
+        last_ts = None
+        while pending:
+            points = pending.popleft().result()
+            submit()
+            for point in points:
+                ts = datapoint_timestamp(point)
+                if last_ts is None or ts > last_ts:
+                    last_ts = ts
+                    yield point
+
+    def _merge_completed(self, pending, submit):
+        seen = set()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.remove(future)
+                points = future.result()
+                if not points:
+                    continue
+                # Only a slice's first and last timestamps can collide with a neighbouring slice
+                edges = (datapoint_timestamp(points[0]), datapoint_timestamp(points[-1]))
+                for point in points:
+                    ts = datapoint_timestamp(point)
+                    if ts in edges:
+                        if ts in seen:
+                            continue
+                        seen.add(ts)
+                    yield point
+            submit()
+
+
+# Batching setup
+class DatapointBatchPlanner:
+    # Packs many datastream ids or aliases into as few get_datapoints calls as the URL length and alias limits allow
+
+    def __init__(self, client, max_url_length: int=2048, max_aliases: int=100, max_workers: int=4,
+                 points_limit: int=None, brief: bool=True):
+        self._client = client
+        self.max_url_length = max_url_length
+        self.max_aliases = max_aliases
+        self.max_workers = max_workers
+        self.points_limit = points_limit
+        self.brief = brief
+
+    def plan(self, datastreams, start_epoch: int, end_epoch: int):
+        params = urlencode({"aliases": "", "startEpoch": start_epoch, "endEpoch": end_epoch, "brief": self.brief})
+        budget = self.max_url_length - len(f"{self._client._base_api_url}datapoints?{params}")
+        batches, batch, length = [], [], 0
+        for key in dict.fromkeys(datastreams):
+            size = len(quote_plus(key))
+            # Every alias after the first also costs an encoded comma
+            if batch and (length + 3 + size > budget or len(batch) >= self.max_aliases):
+                batches.append(batch)
+                batch, length = [], 0
+            if size > budget:
+                raise ValueError(f"{key} does not fit in a URL of {self.max_url_length} characters.")
+            length += size + (3 if batch else 0)
+            batch.append(key)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def fetch_batch(self, batch: list, start_epoch: int, end_epoch: int):
+        result = self._client.get_datapoints(",".join(batch), start_epoch, end_epoch, self.brief)
+        if not is_page(result):
+            raise ResponseError(f"get_datapoints failed for {len(batch)} datastreams: {result}", result)
+        if not (isinstance(result, list) and all(isinstance(group, dict) for group in result)):
+            result = [{"datastream_id": key, "data": records}
+                      for key, records in datapoint_groups(result, batch[0] if len(batch) == 1 else None).items()]
+        wanted = set(batch)
+        points = {}
+        for group in result:
+            # Groups may be keyed by datastream id or by alias, whichever was asked for wins
+            key = next((group.get(field) for field in ("alias", "datastream_id", "id") if group.get(field) in wanted),
+                       None)
+            if key is not None:
+                points[key] = self._complete(group, datapoint_records(group.get("data", [])), end_epoch)
+        return points
+
+    def _complete(self, group: dict, points: list, end_epoch: int):
+        # A datastream that reached the server's points limit was cut short, the rest is fetched on its own
+        if not self.points_limit or len(points) < self.points_limit:
+            return points
+        last_ts = max(datapoint_timestamp(point) for point in points)
+        datastream_id = record_cursor(group, "datastream_id", "id", "alias")
+        fetcher = DatapointRangeFetcher(self._client, max_workers=1, brief=self.brief)
+        points.extend(point for point in fetcher.iter_datapoints(datastream_id, last_ts, end_epoch)
+                      if datapoint_timestamp(point) > last_ts)
+        return points
+
+    def fetch(self, datastreams, start_epoch: int, end_epoch: int):
+        # Returns the points of every requested datastream keyed the way it was requested, in request order
+        datastreams = list(dict.fromkeys(datastreams))
+        batches = self.plan(datastreams, start_epoch, end_epoch)
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="campbellcloud-batch") as pool:
+            for points in pool.map(lambda batch: self.fetch_batch(batch, start_epoch, end_epoch), batches):
+                results.update(points)
+        return {key: results.get(key, []) for key in datastreams}
+
+    def fetch_frame(self, datastreams, start_epoch: int, end_epoch: int):
+        return DatapointFrame({key: DatapointColumns.from_points(points)
+                               for key, points in self.fetch(datastreams, start_epoch, end_epoch).items()})
+
+
+# Streaming setup
+GROUP_KEYS = ("datastream_id", "id", "alias")
+
+
+class JSONArrayStreamer:
+    # Incrementally scans JSON text and decodes every element of the arrays stored under key (or of the top-level
+    # array when key is None). Only the current element is ever buffered. Arrays inside a top-level array of groups
+    # yield (group id, element) pairs, the group id being the first of group_keys found in the group.
+    structural = re.compile(r'["\[\]{},:]')
+    string_special = re.compile(r'["\\]')
+    element_start = re.compile(r'[^\s,]')
+    max_key_length = 256
+    max_element_size = 16 << 20
+
+    def __init__(self, key: str="data", group_keys: tuple=GROUP_KEYS):
+        self.key = key
+        self.group_keys = group_keys
+        self._group_id = None
+        self._held = []
+        self._grouped = False
+        self._items = []
+        self._decoder = json.JSONDecoder()
+        self._stack = []
+        self._in_target = False
+        self._in_string = False
+        self._escape = False
+        self._string_parts = None
+        self._last_string = None
+        self._last_key = None
+        self._buffer = ""
+
+    def feed(self, text: str, final: bool=False):
+        text = self._buffer + text
+        self._buffer = ""
+        position = 0
+        while position < len(text):
+            if self._in_target:
+                position = self._decode_elements(text, position, final)
+                if self._in_target:
+                    break
+            else:
+                position = self._scan(text, position)
+        items, self._items = self._items, []
+        return items
+
+    def _emit(self, item):
+        if not self._grouped:
+            self._items.append(item)
+        elif self._group_id is None:
+            # The group's id comes after its data, hold the elements until it shows up
+            self._held.append(item)
+        else:
+            self._items.append((self._group_id, item))
+
+    def _release_held(self):
+        self._items.extend((self._group_id, item) for item in self._held)
+        self._held = []
+
+    def _decode_elements(self, text: str, position: int, final: bool):
+        while True:
+            match = self.element_start.search(text, position)
+            if match is None:
+                return len(text)
+            position = match.start()
+            if text[position] == "]":
+                self._in_target = False
+                self._stack.pop()
+                return position + 1
             try:
-                json_result = results.json()
-                return json_result
-            except JSONDecodeError:
-                return {'status': 'Success', 'message': "Response returned a 200 with no content"}
+                item, end = self._decoder.raw_decode(text, position)
+            except json.JSONDecodeError:
+                end = None
+            # A number cut short by the chunk boundary still decodes, so an element must be followed by a delimiter
+            if end is None or (end == len(text) and not final) or (end < len(text) and text[end] not in " \t\r\n,]"):
+                if final or len(text) - position > self.max_element_size:
+                    raise ValueError("Could not decode streamed JSON element.")
+                self._buffer = text[position:]
+                return len(text)
+            self._emit(item)
+            position = end
+
+    def _scan(self, text: str, position: int):
+        if self._escape:
+            self._escape = False
+            position += 1
+        while position < len(text):
+            if self._in_string:
+                match = self.string_special.search(text, position)
+                end = len(text) if match is None else match.start()
+                if self._string_parts is not None:
+                    self._string_parts.append(text[position:end])
+                if match is None:
+                    return len(text)
+                if match.group() == "\\":
+                    if end + 1 >= len(text):
+                        self._escape = True
+                    elif self._string_parts is not None:
+                        self._string_parts.append(text[end:end + 2])
+                    position = end + 2
+                    continue
+                self._in_string = False
+                if self._string_parts is not None:
+                    string = "".join(self._string_parts)
+                    self._last_string = string if len(string) <= self.max_key_length else None
+                    self._string_parts = None
+                    if (self._group_id is None and self._last_key in self.group_keys and
+                            self._stack == ["[", "{"] and self.key is not None):
+                        self._group_id = string
+                        self._release_held()
+                position = end + 1
+                continue
+
+            match = self.structural.search(text, position)
+            if match is None:
+                return len(text)
+            char = match.group()
+            position = match.end()
+            top = self._stack[-1] if self._stack else None
+            if char == '"':
+                self._in_string = True
+                self._string_parts = [] if top == "{" else None
+                self._last_string = None
+            elif char == ":":
+                self._last_key = self._last_string
+            elif char in "{[":
+                # Targets sit where ijson's "key.item", "item.key.item" or "item" prefixes would find them
+                if char == "[" and (self._stack in (["{"], ["[", "{"]) and self._last_key == self.key
+                                    or not self._stack and self.key is None):
+                    self._in_target = True
+                    self._grouped = len(self._stack) == 2
+                self._stack.append(char)
+                # A key seen in the enclosing object, such as the previous group's id, never names this one's values
+                self._last_key = None
+                if self._stack == ["[", "{"]:
+                    self._group_id = None
+                if self._in_target:
+                    return position
+            elif char == ",":
+                if top == "{":
+                    self._last_key = None
+            else:
+                if self._stack == ["[", "{"] and self._held:
+                    self._release_held()
+                self._stack.pop()
+        return position
+
+
+def iter_json_items(chunks, key: str="data", group_keys: tuple=GROUP_KEYS):
+    # Uses ijson when it is installed and falls back to JSONArrayStreamer over the stdlib decoder otherwise. A top-level
+    # array of groups always goes to JSONArrayStreamer: telling groups apart takes ijson's per-event Python loop, which
+    # is slower than the stdlib scanner even with the C backend.
+    chunks = iter(chunks)
+    if ijson is not None:
+        first = next((chunk for chunk in chunks if chunk.strip()), b"")
+        if key is None or first.lstrip()[:1] != b"[":
+            yield from ijson.items(ChunkReader(first, chunks), "item" if key is None else f"{key}.item",
+                                   use_float=True)
+            return
+        chunks = itertools.chain((first,), chunks)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    streamer = JSONArrayStreamer(key, group_keys)
+    for chunk in chunks:
+        yield from streamer.feed(decoder.decode(chunk))
+    yield from streamer.feed(decoder.decode(b"", final=True), final=True)
+
+def metered_chunks(chunks, context):
+    # Adds the time spent waiting on a streamed body and its size to the request's context
+    chunks = iter(chunks)
+    while True:
+        start = time.perf_counter()
+        chunk = next(chunks, None)
+        context.network_time += time.perf_counter() - start
+        if chunk is None:
+            return
+        context.response_bytes += len(chunk)
+        yield chunk
+
+def metered_items(items, context):
+    # Time spent producing an item, less the network wait metered_chunks saw meanwhile, is decode time
+    items = iter(items)
+    while True:
+        start, network_time = time.perf_counter(), context.network_time
+        try:
+            item = next(items)
+        except StopIteration:
+            return
+        finally:
+            context.decode_time += time.perf_counter() - start - (context.network_time - network_time)
+        yield item
+
+def batched(items, batch_size: int):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ChunkReader:
+    # Minimal file-like view over an iterator of byte chunks
+
+    def __init__(self, first: bytes, chunks):
+        self._buffer = first
+        self._chunks = chunks
+
+    def read(self, size: int=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+# Bulk setup
+BulkOperation = namedtuple("BulkOperation", ["method", "args", "kwargs"], defaults=[(), {}])
+BulkResult = namedtuple("BulkResult", ["index", "operation", "result", "error", "status_code"], defaults=[None])
+
+def bulk_failed(result):
+    return isinstance(result, dict) and str(result.get("status", "")).startswith("Result code")
+
+
+class BulkExecutor:
+
+    def __init__(self, client, max_workers: int=8, ordered: bool=True, max_failures: int=None,
+                 is_failure=bulk_failed):
+        self._client = client
+        self.max_workers = max_workers
+        self.ordered = ordered
+        self.max_failures = max_failures
+        self.is_failure = is_failure
+
+    def _operation(self, operation):
+        if not isinstance(operation, BulkOperation):
+            operation = BulkOperation(*operation)
+        if operation.method not in type(self._client)._endpoints:
+            raise ValueError(f"{operation.method} is not a CampbellCloud endpoint.")
+        return operation
+
+    def _run(self, index: int, operation: BulkOperation):
+        try:
+            result = getattr(self._client, operation.method)(*operation.args, **operation.kwargs)
+        except Exception as error:
+            return BulkResult(index, operation, None, error)
+        return BulkResult(index, operation, result, None, self._client.last_status_code)
+
+    def failed(self, item: BulkResult):
+        if item.error is not None or (item.status_code is not None and item.status_code >= 400):
+            return True
+        return bool(self.is_failure and self.is_failure(item.result))
+
+    def run(self, operations):
+        operations = enumerate(operations)
+        failures = 0
+        pending = {}
+        completed = {}
+        next_index = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="campbellcloud-bulk") as pool:
+            def submit():
+                # Only a bounded window of operations is queued, so huge iterables stream through. Results held back
+                # behind a slow operation in ordered mode count against the window too.
+                while len(pending) + len(completed) < self.max_workers * 2:
+                    index, operation = next(operations, (None, None))
+                    if index is None:
+                        return
+                    pending[pool.submit(self._run, index, self._operation(operation))] = index
+            try:
+                submit()
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        del pending[future]
+                        item = future.result()
+                        if self.failed(item):
+                            failures += 1
+                        if self.ordered:
+                            completed[item.index] = item
+                        else:
+                            yield item
+                    while next_index in completed:
+                        yield completed.pop(next_index)
+                        next_index += 1
+                    if self.max_failures is not None and failures >= self.max_failures:
+                        return
+                    submit()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+
+# Conversion setup
+def linear_coefficients(definition):
+    # Conversions are applied as value * multiplier + offset
+    if isinstance(definition, dict):
+        for key in ("conversion", "data"):
+            if isinstance(definition.get(key), dict):
+                return linear_coefficients(definition[key])
+        multiplier = next((definition[key] for key in ("multiplier", "factor", "scale", "slope")
+                           if definition.get(key) is not None), None)
+        offset = next((definition[key] for key in ("offset", "intercept") if definition.get(key) is not None), 0)
+        if multiplier is not None:
+            return float(multiplier), float(offset)
+    raise ValueError(f"Unsupported measurement conversion definition: {definition}")
+
+
+class UnitConverter:
+
+    def __init__(self, client):
+        self._client = client
+        self._conversions = {}
+        self._lock = threading.Lock()
+
+    def conversion(self, classification_id: str, source_uom_id: str, target_uom_id: str):
+        if source_uom_id == target_uom_id:
+            return 1.0, 0.0
+        key = (classification_id, source_uom_id, target_uom_id)
+        with self._lock:
+            pending = self._conversions.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._conversions[key] = threading.Event(), []
+        event, result = pending
+        if owner:
+            try:
+                result.append(linear_coefficients(self._client.get_measurement_classification_conversions_by_id(*key)))
+            except Exception as error:
+                with self._lock:
+                    del self._conversions[key]
+                result.append(error)
+                raise
+            finally:
+                event.set()
+        event.wait()
+        if isinstance(result[0], Exception):
+            raise result[0]
+        return result[0]
+
+    def clear(self):
+        with self._lock:
+            self._conversions.clear()
+
+    def convert(self, values, classification_id: str, source_uom_id: str, target_uom_id: str):
+        multiplier, offset = self.conversion(classification_id, source_uom_id, target_uom_id)
+        if isinstance(values, DatapointColumns):
+            return DatapointColumns(values.timestamps, self.convert(values.values, classification_id, source_uom_id,
+                                                                    target_uom_id))
+        if numpy is not None and isinstance(values, numpy.ndarray):
+            return values * multiplier + offset
+        if isinstance(values, (array, memoryview)):
+            return memoryview(array("d", [value * multiplier + offset for value in values]))
+        return [value * multiplier + offset for value in values]
+
+    def convert_points(self, points, classification_id: str, source_uom_id: str, target_uom_id: str):
+        multiplier, offset = self.conversion(classification_id, source_uom_id, target_uom_id)
+        converted = []
+        for point in datapoint_records(points):
+            value = datapoint_value(point) * multiplier + offset
+            if isinstance(point, dict):
+                converted.append(dict(point, value=value))
+            else:
+                converted.append((datapoint_timestamp(point), value))
+        return converted
+
+    def convert_frame(self, frame: DatapointFrame, units: dict):
+        # units maps each datastream id to its (classification_id, source_uom_id, target_uom_id)
+        return DatapointFrame({datastream_id: self.convert(columns, *units[datastream_id]) if datastream_id in units
+                               else columns for datastream_id, columns in frame.items()})
+
+
+# Export setup
+class ExportPipeline:
+
+    complete_statuses = ("complete", "completed", "succeeded", "success", "done", "finished")
+    failed_statuses = ("failed", "error", "errored", "cancelled", "canceled")
+
+    def __init__(self, client, directory: str, max_workers: int=4, chunk_size: int=1 << 20,
+                 poll_interval: float=1.0, max_poll_interval: float=30.0, poll_backoff: float=1.5,
+                 timeout: float=3600.0, max_resumes: int=3):
+        self._client = client
+        self.directory = directory
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.poll_backoff = poll_backoff
+        self.timeout = timeout
+        self.max_resumes = max_resumes
+
+    def run(self, metadata: dict):
+        export = self._client.create_export(metadata)
+        export_id = record_cursor(export, "id", "export_id")
+        if export_id is None:
+            raise ResponseError(f"Export could not be created: {export}", export)
+        return self.download_export(export_id)
+
+    def download_export(self, export_id: str, export_job_id: str=None):
+        job = self.wait_for_job(export_id, export_job_id)
+        export_job_id = record_cursor(job, "id", "job_id") or export_job_id
+        if export_job_id is None:
+            raise ResponseError(f"Export job of {export_id} has no id: {job}", job)
+        return self.download_job(export_id, export_job_id)
+
+    def wait_for_job(self, export_id: str, export_job_id: str=None):
+        # Polls back off while the job is unchanged and speed up again whenever its state moves
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        interval = self.poll_interval
+        previous = None
+        while True:
+            if export_job_id is None:
+                jobs = self._client.list_export_jobs(export_id)
+                if not is_page(jobs) or not page_records(jobs):
+                    raise ResponseError(f"Export {export_id} has no jobs to wait for: {jobs}", jobs)
+                job = page_records(jobs)[-1]
+            else:
+                job = self._client.get_export_job(export_id, export_job_id)
+            status_code = self._client.last_status_code
+            if not isinstance(job, dict) or (status_code is not None and status_code >= 400):
+                raise ResponseError(f"Export job of {export_id} could not be fetched: {job}", job)
+            status = str(record_cursor(job, "status", "state") or "").lower()
+            if status in self.complete_statuses:
+                return job
+            if status in self.failed_statuses:
+                raise RuntimeError(f"Export job failed: {job}")
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Export {export_id} did not complete within {self.timeout} seconds.")
+            interval = self.poll_interval if job != previous else min(self.max_poll_interval,
+                                                                      interval * self.poll_backoff)
+            previous = job
+            time.sleep(interval if deadline is None else max(0.0, min(interval, deadline - time.monotonic())))
+
+    def download_job(self, export_id: str, export_job_id: str):
+        files = self._client.list_export_job_files(export_id, export_job_id)
+        status_code = self._client.last_status_code
+        if (status_code is not None and status_code >= 400) or not is_page(files):
+            raise ResponseError(f"Files of export job {export_job_id} could not be listed: {files}", files)
+        files = page_records(files)
+        os.makedirs(self.directory, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="campbellcloud-export") as pool:
+            return list(pool.map(lambda record: self.download_file(export_id, export_job_id, record), files))
+
+    def download_file(self, export_id: str, export_job_id: str, file_record: dict):
+        file_id = record_cursor(file_record, "id", "file_id")
+        url = record_cursor(file_record, "url", "download_url") or \
+            f"{self._client._base_api_url}exports/{export_id}/jobs/{export_job_id}/files/{file_id}"
+        name = os.path.basename(str(record_cursor(file_record, "name", "filename") or file_id))
+        expected = record_cursor(file_record, "size", "content_length")
+        expected = None if expected is None else int(expected)
+        path = os.path.join(self.directory, name)
+        if expected is not None and os.path.exists(path) and os.path.getsize(path) == expected:
+            return path
+
+        partial = path + ".part"
+        offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+        if expected is not None and offset > expected:
+            offset = 0
+        attempt = 0
+        while expected is None or offset < expected:
+            try:
+                offset = self._stream_to_file(url, partial, offset)
+                break
+            except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError):
+                # Resume the interrupted transfer from whatever reached the disk
+                attempt += 1
+                if attempt > self.max_resumes:
+                    raise
+                offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+        if expected is not None and offset != expected:
+            raise OSError(f"Downloaded {offset} bytes of {name}, expected {expected}.")
+        os.replace(partial, path)
+        return path
+
+    def _stream_to_file(self, url: str, partial: str, offset: int):
+        # Only the API host gets the bearer token, pre-signed download links carry their own credentials
+        headers = dict(self._client._token) if url.startswith(self._client._api_url) else {}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+        with self._client.transport.get(url, headers=headers, stream=True) as response:
+            if response.status_code == 416:
+                return offset
+            if response.status_code not in (200, 206):
+                raise OSError(f"Export file download failed with status {response.status_code}: {url}")
+            if response.status_code == 200:
+                offset = 0
+            with open(partial, "ab" if offset else "wb") as file:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    file.write(chunk)
+                    offset += len(chunk)
+        return offset
+
+
+# Sync setup
+class DatastreamSync:
+
+    def __init__(self, client, database: str, lookback: int=0, batch_size: int=5000, initial_start_epoch: int=0,
+                 max_workers: int=4, slice_points: int=5000):
+        self._client = client
+        self.lookback = lookback
+        self.batch_size = batch_size
+        self.initial_start_epoch = initial_start_epoch
+        # Points must arrive in timestamp order, a failed slice then stops the sync before the checkpoint passes it
+        self._fetcher = DatapointRangeFetcher(client, max_workers=max_workers, slice_points=slice_points, ordered=True)
+        self._connection = sqlite3.connect(database)
+        with self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS checkpoints ("
+                                     "datastream_id TEXT PRIMARY KEY, high_water INTEGER NOT NULL, synced_at REAL)")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS datapoints ("
+                                     "datastream_id TEXT NOT NULL, ts INTEGER NOT NULL, value, "
+                                     "PRIMARY KEY (datastream_id, ts)) WITHOUT ROWID")
+
+    @property
+    def connection(self):
+        return self._connection
+
+    def high_water(self, datastream_id: str):
+        row = self._connection.execute("SELECT high_water FROM checkpoints WHERE datastream_id = ?",
+                                       (datastream_id,)).fetchone()
+        return None if row is None else row[0]
+
+    def sync_datastream(self, datastream_id: str, end_epoch: int=None):
+        high_water = self.high_water(datastream_id)
+        last = self._client.get_datastream_datapoints_last(datastream_id)
+        status_code = self._client.last_status_code
+        # The last point may come back as a page or as the bare point itself
+        if (status_code is not None and status_code >= 400) or not (is_page(last) or
+                                                                    datapoint_timestamp(last) is not None):
+            raise ResponseError(f"Last datapoint of {datastream_id} could not be fetched: {last}", last)
+        last_points = datapoint_records(last)
+        last_ts = datapoint_timestamp(last_points[-1] if last_points else last)
+        if last_ts is None or (high_water is not None and last_ts <= high_water and not self.lookback):
+            return 0
+        start_epoch = self.initial_start_epoch
+        if high_water is not None:
+            start_epoch = max(start_epoch, high_water - self.lookback)
+        end_epoch = last_ts if end_epoch is None else min(end_epoch, last_ts)
+        if start_epoch > end_epoch:
+            return 0
+
+        written = 0
+        batch = []
+        for point in self._fetcher.iter_datapoints(datastream_id, start_epoch, end_epoch):
+            batch.append(point)
+            if len(batch) >= self.batch_size:
+                written += self._commit_batch(datastream_id, batch, high_water)
+                batch = []
+        if batch:
+            written += self._commit_batch(datastream_id, batch, high_water)
+        return written
+
+    def sync_all(self, asset_id: str=None, station_id: str=None, end_epoch: int=None):
+        results = {}
+        for datastream in self._client.iter_datastreams(asset_id=asset_id, station_id=station_id):
+            datastream_id = record_cursor(datastream, "id", "datastream_id")
+            if datastream_id is not None:
+                results[datastream_id] = self.sync_datastream(datastream_id, end_epoch)
+        return results
+
+    def _commit_batch(self, datastream_id: str, batch: list, high_water: int | None):
+        rows = [(datastream_id, int(datapoint_timestamp(point)), self._column_value(point)) for point in batch]
+        batch_high_water = max(row[1] for row in rows)
+        if high_water is not None:
+            batch_high_water = max(batch_high_water, high_water)
+        with self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO datapoints (datastream_id, ts, value) VALUES (?, ?, ?)",
+                                         rows)
+            self._connection.execute("INSERT INTO checkpoints (datastream_id, high_water, synced_at) VALUES (?, ?, ?) "
+                                     "ON CONFLICT (datastream_id) DO UPDATE SET "
+                                     "high_water = MAX(high_water, excluded.high_water), synced_at = excluded.synced_at",
+                                     (datastream_id, batch_high_water, time.time()))
+        return len(rows)
+
+    @staticmethod
+    def _column_value(point):
+        value = point.get("value", point.get("v")) if isinstance(point, dict) else point[1]
+        if value is None or isinstance(value, (int, float, str)):
+            return value
+        return json.dumps(value)
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Fleet setup
+FleetDiff = namedtuple("FleetDiff", ["added", "changed", "removed", "failed", "fetched"])
+
+def state_fingerprint(state, ignore=frozenset()):
+    if isinstance(state, dict) and ignore:
+        state = {key: value for key, value in state.items() if key not in ignore}
+    encoded = json.dumps(state, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=8).digest()
+
+
+class FleetSnapshot:
+    # Only an 8 byte fingerprint of every state is kept between ticks, full states are returned for differences only
+    endpoints = {"station": ("list_stations", "get_station_state"), "asset": ("list_assets", "get_asset_state")}
+
+    def __init__(self, client, max_workers: int=16, ignore=(), full_every: int=None, kinds=("station", "asset"),
+                 is_failure=bulk_failed):
+        self._client = client
+        self.max_workers = max_workers
+        self.ignore = frozenset(ignore)
+        self.full_every = full_every
+        self.kinds = tuple(kinds)
+        self.is_failure = is_failure
+        self._fingerprints = {}
+        self._suspicious = set()
+        self._ticks = 0
+
+    @property
+    def suspicious(self):
+        return frozenset(self._suspicious)
+
+    def __len__(self):
+        return len(self._fingerprints)
+
+    def __contains__(self, key):
+        return key in self._fingerprints
+
+    def members(self):
+        keys = []
+        for kind in self.kinds:
+            result = getattr(self._client, self.endpoints[kind][0])()
+            if not is_page(result):
+                # An empty listing here would report the whole fleet as removed
+                raise ResponseError(f"{self.endpoints[kind][0]} failed: {result}", result)
+            for record in page_records(result):
+                member_id = record_cursor(record, "id", f"{kind}_id")
+                if member_id is not None:
+                    keys.append((kind, member_id))
+        return keys
+
+    def snapshot(self):
+        keys = self.members()
+        diff = self._fetch(keys)
+        listed = set(keys)
+        removed = [key for key in self._fingerprints if key not in listed]
+        for key in removed:
+            del self._fingerprints[key]
+            self._suspicious.discard(key)
+        return diff._replace(removed=removed)
+
+    def refresh(self, keys=None):
+        # Re-fetches only the given members, by default the ones that changed or failed on the previous fetch
+        return self._fetch(list(self._suspicious if keys is None else keys))
+
+    def tick(self):
+        # A full snapshot on the first tick and every full_every ticks, only the suspicious subset in between
+        full = not self._fingerprints or (self.full_every and self._ticks % self.full_every == 0)
+        self._ticks += 1
+        return self.snapshot() if full else self.refresh()
+
+    def _fetch(self, keys: list):
+        added, changed, failed = {}, {}, {}
+        suspicious = set()
+        operations = (BulkOperation(self.endpoints[kind][1], (member_id,)) for kind, member_id in keys)
+        executor = BulkExecutor(self._client, max_workers=self.max_workers, ordered=False, is_failure=self.is_failure)
+        for item in executor.run(operations):
+            key = keys[item.index]
+            if executor.failed(item):
+                failed[key] = item.result if item.error is None else item.error
+                suspicious.add(key)
+                continue
+            fingerprint = state_fingerprint(item.result, self.ignore)
+            previous = self._fingerprints.get(key)
+            if previous == fingerprint:
+                continue
+            self._fingerprints[key] = fingerprint
+            if previous is None:
+                added[key] = item.result
+            else:
+                changed[key] = item.result
+                suspicious.add(key)
+        # Members that were re-fetched and settled drop out of the suspicious subset
+        self._suspicious.difference_update(keys)
+        self._suspicious.update(suspicious)
+        return FleetDiff(added, changed, [], failed, len(keys))
+
+
+# Alert setup
+AlertEvent = namedtuple("AlertEvent", ["alert_filter", "record"])
+
+
+class AlertWatcher:
+    # Tails alert events or logs. Every filter keeps a high-water cursor, so each poll only asks for the window since
+    # the previous poll (reaching back by overlap), and events already delivered are skipped by id.
+    sources = ("events", "logs")
+
+    def __init__(self, client, filters, source: str="events", start_epoch: int=None, overlap: int=60_000,
+                 max_seen: int=10_000, min_interval: float=5.0, max_interval: float=300.0, backoff: float=2.0,
+                 page_limit: int=100, callbacks=()):
+        if source not in self.sources:
+            raise ValueError(f"source must be one of {', '.join(self.sources)}.")
+        self._client = client
+        self.source = source
+        self.overlap = overlap
+        self.max_seen = max_seen
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.page_limit = page_limit
+        self.interval = min_interval
+        start_epoch = int(time.time() * 1000) if start_epoch is None else start_epoch
+        filters = [filters] if isinstance(filters, str) else filters
+        self._cursors = {alert_filter: start_epoch for alert_filter in filters}
+        self._seen = OrderedDict()
+        self._callbacks = list(callbacks)
+        self._stop = threading.Event()
+        self._stats = {"polls": 0, "delivered": 0, "duplicates": 0, "errors": 0}
+
+    @property
+    def cursors(self):
+        return dict(self._cursors)
+
+    def add_callback(self, callback):
+        # Callbacks are called as callback(alert_filter, record) for every new event
+        self._callbacks.append(callback)
+        return callback
+
+    def poll(self):
+        events = []
+        failed = False
+        for alert_filter, cursor in self._cursors.items():
+            end_epoch = int(time.time() * 1000)
+            try:
+                records = self._fetch(alert_filter, cursor, end_epoch)
+            except Exception:
+                # The cursor is left where it was, so the window is retried on the next poll
+                failed = True
+                continue
+            events.extend(AlertEvent(alert_filter, record) for record in records
+                          if self._first_sighting(alert_filter, record))
+            # The next window reaches back by overlap so events that arrive late are not missed
+            self._cursors[alert_filter] = max(cursor, end_epoch - self.overlap)
+        self._stats["polls"] += 1
+        self._stats["errors"] += failed
+        self._stats["delivered"] += len(events)
+        # Activity brings polling back to min_interval, quiet periods and errors back it off towards max_interval
+        if events:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+        for event in events:
+            for callback in self._callbacks:
+                callback(event.alert_filter, event.record)
+        return events
+
+    def _fetch(self, alert_filter: str, start_epoch: int, end_epoch: int):
+        # Alert events are paged by the server, a page shorter than the largest one seen is the last one
+        records = []
+        page_size = 1 if self.source == "events" else self.page_limit
+        while True:
+            if self.source == "events":
+                page = self._client.list_alert_events(alert_filter, end_epoch, start_epoch=start_epoch,
+                                                      offset=len(records))
+            else:
+                page = self._client.list_alert_logs(alert_filter, end_epoch, start_epoch=start_epoch,
+                                                    offset=len(records), limit=self.page_limit)
+            if not is_page(page):
+                raise ResponseError(f"Polling alert {self.source} for {alert_filter} failed: {page}", page)
+            page = page_records(page)
+            records.extend(page)
+            page_size = max(page_size, len(page))
+            if len(page) < page_size:
+                return records
+
+    def _first_sighting(self, alert_filter: str, record):
+        key = (alert_filter, record_cursor(record, "id", "alert_event_id", "alert_log_id"))
+        if key[1] is None:
+            key = (alert_filter, state_fingerprint(record))
+        if key in self._seen:
+            self._stats["duplicates"] += 1
+            return False
+        self._seen[key] = None
+        while len(self._seen) > self.max_seen:
+            self._seen.popitem(last=False)
+        return True
+
+    def run(self):
+        # Polls until stop() is called, sleeping for the adaptive interval between polls
+        self._stop.clear()
+        while not self._stop.is_set():
+            self.poll()
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+
+    async def events(self):
+        # Async iterator over new events, polling in a worker thread so the event loop is never blocked
+        self._stop.clear()
+        loop = asyncio.get_running_loop()
+        while not self._stop.is_set():
+            for event in await loop.run_in_executor(None, self.poll):
+                yield event
+            await asyncio.sleep(self.interval)
+
+    def __aiter__(self):
+        return self.events()
+
+    def stats(self):
+        return dict(self._stats, interval=self.interval, seen=len(self._seen))
+
+
+# Middleware setup
+class RequestContext:
+    # A streamed context hands the unread response back to its caller, which reads the body and then calls finish()
+    __slots__ = ("client", "method", "args", "kwargs", "response", "network_time", "decode_time", "stream",
+                 "response_bytes", "finalizers")
+
+    def __init__(self, client, method: str, args: tuple, kwargs: dict, stream: bool=False):
+        self.client = client
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self.response = None
+        self.network_time = 0.0
+        self.decode_time = 0.0
+        self.stream = stream
+        self.response_bytes = None
+        self.finalizers = []
+
+    def finish(self):
+        finalizers, self.finalizers = self.finalizers, []
+        for finalizer in finalizers:
+            finalizer()
+
+
+class MetricsMiddleware:
+
+    def __init__(self, buckets: tuple=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._methods = {}
+
+    def __call__(self, context: RequestContext, call_next):
+        start = time.perf_counter()
         try:
-            return results.json()
+            return call_next(context)
+        finally:
+            if context.stream and context.response is not None:
+                # A streamed body is sized and timed once its reader is done with it
+                context.finalizers.append(lambda: self.record(context, time.perf_counter() - start))
+            else:
+                self.record(context, time.perf_counter() - start)
+
+    def record(self, context: RequestContext, latency: float):
+        response = context.response
+        status = str(response.status_code) if response is not None else "error"
+        size = context.response_bytes
+        if size is None:
+            size = len(response.content or b"") if response is not None else 0
+        with self._lock:
+            stats = self._methods.get(context.method)
+            if stats is None:
+                stats = self._methods[context.method] = {
+                    "count": 0, "latency_sum": 0.0, "network_sum": 0.0, "decode_sum": 0.0, "bytes_sum": 0,
+                    "buckets": [0] * (len(self.buckets) + 1), "status": {}}
+            stats["count"] += 1
+            stats["latency_sum"] += latency
+            stats["network_sum"] += context.network_time
+            stats["decode_sum"] += context.decode_time
+            stats["bytes_sum"] += size
+            stats["buckets"][bisect.bisect_left(self.buckets, latency)] += 1
+            stats["status"][status] = stats["status"].get(status, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._methods.clear()
+
+    def snapshot(self):
+        with self._lock:
+            methods = {}
+            for method, stats in self._methods.items():
+                cumulative = 0
+                histogram = {}
+                for bound, count in zip(self.buckets + (math.inf,), stats["buckets"]):
+                    cumulative += count
+                    histogram["+Inf" if bound == math.inf else str(bound)] = cumulative
+                methods[method] = dict(stats, buckets=histogram, status=dict(stats["status"]))
+            return methods
+
+    def prometheus(self, prefix: str="campbellcloud"):
+        lines = []
+        snapshot = self.snapshot()
+        lines.append(f"# TYPE {prefix}_request_duration_seconds histogram")
+        for method, stats in snapshot.items():
+            for bound, count in stats["buckets"].items():
+                lines.append(f'{prefix}_request_duration_seconds_bucket{{method="{method}",le="{bound}"}} {count}')
+            lines.append(f'{prefix}_request_duration_seconds_sum{{method="{method}"}} {stats["latency_sum"]}')
+            lines.append(f'{prefix}_request_duration_seconds_count{{method="{method}"}} {stats["count"]}')
+        for name, key, kind in (("network_seconds_total", "network_sum", "counter"),
+                                ("decode_seconds_total", "decode_sum", "counter"),
+                                ("response_bytes_total", "bytes_sum", "counter")):
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for method, stats in snapshot.items():
+                lines.append(f'{prefix}_{name}{{method="{method}"}} {stats[key]}')
+        lines.append(f"# TYPE {prefix}_responses_total counter")
+        for method, stats in snapshot.items():
+            for status, count in stats["status"].items():
+                lines.append(f'{prefix}_responses_total{{method="{method}",status="{status}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+# Wrapper setup
+no_reauthenticate = ("create_token", "refresh_token")
+
+def decode_response(results):
+    if results is None:
+        return {'status': 'Results is type None'}
+    elif results.status_code == 304:
+        try:
+            json_result = results.json()
+            return json_result
+        except JSONDecodeError:
+            return {'message': 'No metadata fields provided for update'}
+    elif results.status_code == 204:
+        try:
+            json_result = results.json()
+            return json_result
         except JSONDecodeError:
-            return {'status': f'Result code of request is {results.status_code}. Could not convert to JSON.'}
+            return {'status': 'Success', 'message': 'Response returned a 204 with no content'}
+    elif results.status_code == 200:
+        try:
+            json_result = results.json()
+            return json_result
+        except JSONDecodeError:
+            return {'status': 'Success', 'message': "Response returned a 200 with no content"}
+    try:
+        return results.json()
+    except JSONDecodeError:
+        return {'status': f'Result code of request is {results.status_code}. Could not convert to JSON.'}
+
+def send_request(func, client, args, kwargs):
+    results = func(client, *args, **kwargs)
+    if results is not None and results.status_code == 401 and func.__name__ not in no_reauthenticate:
+        # The token was rejected, re-authenticate once and replay the request
+        results.close()
+        client._expire_token(results.request.headers.get("Authorization"))
+        results = func(client, *args, **kwargs)
+    return results
+
+def request_wrapper(func):
+    def handle(context):
+        start = time.perf_counter()
+        if context.stream:
+            with context.client._transport.streaming():
+                context.response = send_request(func, context.client, context.args, context.kwargs)
+        else:
+            context.response = send_request(func, context.client, context.args, context.kwargs)
+        context.client._local.status_code = getattr(context.response, "status_code", None)
+        decode_start = time.perf_counter()
+        context.network_time = decode_start - start
+        if context.stream:
+            return context.response
+        result = decode_response(context.response)
+        context.decode_time = time.perf_counter() - decode_start
+        return result
+
+    def dispatch(client, context: RequestContext):
+        if func.__name__ not in no_reauthenticate:
+            # Authenticate before any middleware starts timing, create_token is measured on its own
+            client._token
+        client._local.status_code = None
+        call = handle
+        for layer in reversed(client._middleware):
+            call = functools.partial(layer, call_next=call)
+        return call(context)
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if not self._middleware:
+            response = send_request(func, self, args, kwargs)
+            self._local.status_code = getattr(response, "status_code", None)
+            return decode_response(response)
+        return dispatch(self, RequestContext(self, func.__name__, args, kwargs))
+    wrapper.dispatch = dispatch
     return wrapper
 
+def helper(func):
+    # Marks a public CampbellCloud method that is not an API endpoint, so wrap_all_methods leaves it alone
+    func.is_helper = True
+    return func
+
 def wrap_all_methods(cls):
-    no_wrap = ["__init__", "_CampbellCloud__build_auth_header"]
+    # Every public method is an endpoint unless it is marked with @helper
+    endpoints = []
     for name, method in cls.__dict__.items():
-        if callable(method) and name not in no_wrap:
+        if callable(method) and not name.startswith("_") and not getattr(method, "is_helper", False):
             setattr(cls, name, request_wrapper(method))
+            endpoints.append(name)
+    cls._endpoints = tuple(endpoints)
     return cls
 
 
 @wrap_all_methods
 class CampbellCloud:
 
-    def __init__(self, organization_id: str, username: str, password: str):
+    streamable = ("get_datapoints", "get_datastream_datapoints", "list_asset_historical", "list_datastream_historical",
+                  "list_station_historical", "list_alert_configuration_historical", "list_dashboard_historical",
+                  "list_data_collection_type_historical")
+
+    def __init__(self, organization_id: str, username: str, password: str, transport: Transport=None,
+                 refresh_margin: float=60.0, middleware: list=None, api_url: str=DEFAULT_API_URL):
         self._organization_id = organization_id
         self._username = username
         self._password = password
-        self._base_api_url = f"https://us-west-2.campbell-cloud.com/api/v1/organizations/{self._organization_id}/"
-        self._measurement_api_url = "https://us-west-2.campbell-cloud.com/api/v1/libraries/"
-        self._token_api_url = "https://us-west-2.campbell-cloud.com/api/v1/tokens"
-        self._product_api_url = "https://us-west-2.campbell-cloud.com/api/v1/product-registrations"
-        self._token = self.__build_auth_header()
-
-    def __build_auth_header(self):
+        self._api_url = api_url.rstrip("/") + "/"
+        self._base_api_url = f"{self._api_url}organizations/{self._organization_id}/"
+        self._measurement_api_url = f"{self._api_url}libraries/"
+        self._token_api_url = f"{self._api_url}tokens"
+        self._product_api_url = f"{self._api_url}product-registrations"
+        self._owns_transport = transport is None
+        self._transport = Transport() if transport is None else transport
+        self.refresh_margin = refresh_margin
+        self._token_lock = threading.Lock()
+        self._auth_header = None
+        self._raw_refresh_token = None
+        self._token_expires_at = math.inf
+        self._middleware = list(middleware or [])
+        self._identity = self
+        self._local = threading.local()
+
+    @property
+    def _token(self):
+        # Authenticates lazily on first use and renews the token refresh_margin seconds before it expires
+        if self._identity is not self:
+            return self._identity._token
+        auth_header = self._auth_header
+        if auth_header is None or time.monotonic() >= self._token_expires_at - self.refresh_margin:
+            auth_header = self.__renew_token(auth_header)
+        return auth_header
+
+    def __renew_token(self, stale_header):
+        with self._token_lock:
+            # Another thread renewed the token while this one waited
+            if self._auth_header is not None and self._auth_header is not stale_header:
+                return self._auth_header
+            if self._auth_header is not None and self._raw_refresh_token:
+                try:
+                    return self.__build_auth_header(self.refresh_token())
+                except SyntaxError:
+                    pass
+            return self.__build_auth_header()
+
+    def __build_auth_header(self, token_result: dict=None):
+        if token_result is None:
+            token_result = self.create_token(self._username, self._password, "cloud", "password")
         try:
-            raw_token = self.create_token(self._username, self._password, "cloud", "password")['access_token']
-            return {"Authorization": "Bearer " + raw_token}
-        except KeyError:
+            raw_token = token_result['access_token']
+        except (KeyError, TypeError):
             raise SyntaxError("Invalid credentials. Please check username and password.")
+        self._raw_refresh_token = token_result.get("refresh_token", self._raw_refresh_token)
+        expires_in = token_result.get("expires_in")
+        self._token_expires_at = time.monotonic() + float(expires_in) if expires_in else math.inf
+        self._auth_header = {"Authorization": "Bearer " + raw_token}
+        return self._auth_header
+
+    def _expire_token(self, rejected_authorization: str=None):
+        if self._identity is not self:
+            return self._identity._expire_token(rejected_authorization)
+        with self._token_lock:
+            if self._auth_header is None:
+                return
+            if rejected_authorization is None or self._auth_header["Authorization"] == rejected_authorization:
+                self._auth_header = None
+
+    @property
+    def transport(self):
+        return self._transport
+
+    @property
+    def middleware(self):
+        return tuple(self._middleware)
+
+    @property
+    def last_status_code(self):
+        # HTTP status of the last endpoint call made by the current thread
+        return getattr(self._local, "status_code", None)
+
+    @property
+    def organization_id(self):
+        return self._organization_id
+
+    @property
+    def api_url(self):
+        return self._api_url
+
+    @helper
+    def for_organization(self, organization_id: str):
+        # A separate handle on another organization that shares this client's token, transport and middleware
+        client = type(self)(organization_id, self._username, self._password, transport=self._transport,
+                            refresh_margin=self.refresh_margin, middleware=self._middleware, api_url=self._api_url)
+        client._identity = self._identity
+        return client
+
+    @helper
+    def add_middleware(self, middleware):
+        # Middleware is called as middleware(context, call_next), the first one added is the outermost
+        self._middleware = self._middleware + [middleware]
+        return middleware
+
+    @helper
+    def remove_middleware(self, middleware):
+        self._middleware = [layer for layer in self._middleware if layer is not middleware]
+
+    @helper
+    def close(self):
+        if self._owns_transport:
+            self._transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # ===================================================
+    #                  Datapoint Helpers
+    # ===================================================
+
+    @helper
+    def get_datapoints_columns(self, aliases: str, start_epoch: int, end_epoch: int, brief=True):
+        return DatapointFrame.from_response(self.get_datapoints(aliases, start_epoch, end_epoch, brief))
+
+    @helper
+    def get_datastream_datapoints_columns(self, datastream_id: str, start_epoch: int, end_epoch: int, limit: int=100):
+        result = self.get_datastream_datapoints(datastream_id, start_epoch, end_epoch, brief=True, limit=limit)
+        return DatapointColumns.from_points(datapoint_records(result))
+
+    @helper
+    def iter_datastream_datapoints_range(self, datastream_id: str, start_epoch: int, end_epoch: int,
+                                         max_workers: int=4, slice_points: int=5000, ordered: bool=True):
+        fetcher = DatapointRangeFetcher(self, max_workers=max_workers, slice_points=slice_points, ordered=ordered)
+        return fetcher.iter_datapoints(datastream_id, start_epoch, end_epoch)
+
+    @helper
+    def get_datapoints_batched(self, datastreams, start_epoch: int, end_epoch: int, brief: bool=True,
+                               max_workers: int=4, max_url_length: int=2048, max_aliases: int=100):
+        planner = DatapointBatchPlanner(self, max_url_length=max_url_length, max_aliases=max_aliases,
+                                        max_workers=max_workers, brief=brief)
+        return planner.fetch(datastreams, start_epoch, end_epoch)
+
+    @helper
+    def stream(self, method: str, *args, batch_size: int=None, key: str="data", chunk_size: int=1 << 16, **kwargs):
+        # Parses the response of a datapoint or historical endpoint incrementally instead of calling .json(). When the
+        # response is an array of groups, as get_datapoints returns, (datastream id, element) pairs are yielded.
+        if method not in self.streamable:
+            raise ValueError(f"{method} does not support streaming.")
+        context = RequestContext(self, method, args, kwargs, stream=True)
+        response = getattr(type(self), method).dispatch(self, context)
+        try:
+            with response:
+                response.raise_for_status()
+                chunks = response.iter_content(chunk_size=chunk_size)
+                if self._middleware:
+                    context.response_bytes = 0
+                    chunks = metered_chunks(chunks, context)
+                items = iter_json_items(chunks, key)
+                if self._middleware:
+                    items = metered_items(items, context)
+                yield from (items if batch_size is None else batched(items, batch_size))
+        finally:
+            context.finish()
+
+    @helper
+    def stream_datapoints(self, aliases: str, start_epoch: int, end_epoch: int, brief=True, batch_size: int=None):
+        return self.stream("get_datapoints", aliases, start_epoch, end_epoch, brief, batch_size=batch_size)
+
+    @helper
+    def stream_datastream_datapoints(self, datastream_id: str, start_epoch: int, end_epoch: int, brief: bool=True,
+                                     limit: int=100, batch_size: int=None):
+        return self.stream("get_datastream_datapoints", datastream_id, start_epoch, end_epoch, brief, limit,
+                           batch_size=batch_size)
+
+    @helper
+    def bulk(self, operations, max_workers: int=8, ordered: bool=True, max_failures: int=None,
+             is_failure=bulk_failed):
+        executor = BulkExecutor(self, max_workers=max_workers, ordered=ordered, max_failures=max_failures,
+                                is_failure=is_failure)
+        return executor.run(operations)
+
+    # ===================================================
+    #                 Paginated Iterators
+    # ===================================================
+
+    @helper
+    def iter_datastreams(self, limit: int=100, asset_id: str=None, station_id: str=None):
+        def fetch_page(offset):
+            return self.list_datastreams(limit=limit, offset=offset, asset_id=asset_id, station_id=station_id)
+        def next_offset(offset, records):
+            return offset + len(records) if len(records) >= limit else None
+        return iter_pages(fetch_page, 0, next_offset)
+
+    @helper
+    def iter_datastreams_labels(self, limit: int=1000):
+        def fetch_page(start_after):
+            return self.list_datastreams_labels(limit=limit, start_after=start_after)
+        def next_start_after(start_after, records):
+            return record_cursor(records[-1], "label", "name", "id") if len(records) >= limit else None
+        return iter_pages(fetch_page, None, next_start_after)
+
+    @helper
+    def iter_dashboards(self, first: int=100, brief: bool=True, latest: bool=True):
+        def fetch_page(after):
+            return self.list_dashboards(before=None, after=after, first=first, last=None, brief=brief, latest=latest)
+        def next_after(after, records):
+            return record_cursor(records[-1], "cursor", "id") if len(records) >= first else None
+        return iter_pages(fetch_page, None, next_after)
+
+    @helper
+    def iter_dashboard_historical(self, dashboard_id: str, first: int=100, reverse: bool=None, brief: bool=None):
+        def fetch_page(after):
+            return self.list_dashboard_historical(dashboard_id, after=after, first=first, last=None, reverse=reverse,
+                                                  brief=brief)
+        def next_after(after, records):
+            return record_cursor(records[-1], "cursor", "id") if len(records) >= first else None
+        return iter_pages(fetch_page, None, next_after)
+
+    @helper
+    def iter_alert_configuration_historical(self, alert_id: str, end_epoch: int, start_epoch: int=0, limit: int=100):
+        def fetch_page(offset):
+            return self.list_alert_configuration_historical(alert_id, end_epoch, start_epoch=start_epoch,
+                                                            offset=offset, limit=limit)
+        def next_offset(offset, records):
+            return offset + len(records) if len(records) >= limit else None
+        return iter_pages(fetch_page, 0, next_offset)
+
+    @helper
+    def iter_alert_logs(self, alert_filter: str, end_epoch: int, start_epoch: int=0, limit: int=100):
+        def fetch_page(offset):
+            return self.list_alert_logs(alert_filter, end_epoch, start_epoch=start_epoch, offset=offset, limit=limit)
+        def next_offset(offset, records):
+            return offset + len(records) if len(records) >= limit else None
+        return iter_pages(fetch_page, 0, next_offset)
 
     # ===================================================
     #                   API Endpoints
     # ===================================================
 
     def list_assets(self):
-        return requests.get(f"{self._base_api_url}assets", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}assets", headers=self._token)
 
     def create_asset(self, metadata: dict):
-        return requests.post(f"{self._base_api_url}assets", headers=self._token, json=metadata)
+        return self._transport.post(f"{self._base_api_url}assets", headers=self._token, json=metadata)
 
     def get_asset(self, asset_id: str):
-        return requests.get(f"{self._base_api_url}assets/{asset_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}assets/{asset_id}", headers=self._token)
 
     def update_asset(self, asset_id: str, metadata: dict):
-        return requests.put(f"{self._base_api_url}assets/{asset_id}", headers=self._token, json=metadata)
+        return self._transport.put(f"{self._base_api_url}assets/{asset_id}", headers=self._token, json=metadata)
 
     def delete_asset(self, asset_id: str):
-        return requests.delete(f"{self._base_api_url}assets/{asset_id}", headers=self._token)
+        return self._transport.delete(f"{self._base_api_url}assets/{asset_id}", headers=self._token)
 
     def get_asset_state(self, asset_id: str):
-        return requests.get(f"{self._base_api_url}assets/{asset_id}/state", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}assets/{asset_id}/state", headers=self._token)
 
     def update_asset_state(self, asset_id: str, status: str):
-        return requests.put(f"{self._base_api_url}assets/{asset_id}/status", headers=self._token, json={"status": status})
+        return self._transport.put(f"{self._base_api_url}assets/{asset_id}/status", headers=self._token, json={"status": status})
 
     def update_asset_metadata(self, asset_id: str, metadata: dict):
-        return requests.put(f"{self._base_api_url}assets/{asset_id}/metadata", headers=self._token, json=metadata)
+        return self._transport.put(f"{self._base_api_url}assets/{asset_id}/metadata", headers=self._token, json=metadata)
 
     def list_asset_historical(self, asset_id: str, start_epoch: int, end_epoch: int):
         params = {"startEpoch": start_epoch, "endEpoch": end_epoch}
-        return requests.get(f"{self._base_api_url}assets/{asset_id}/historical", headers=self._token, params=params)
+        return self._transport.get(f"{self._base_api_url}assets/{asset_id}/historical", headers=self._token, params=params)
 
     def get_asset_historical_by_id(self, asset_id: str, asset_historical_id: str):
-        return requests.get(f"{self._base_api_url}assets/{asset_id}/historical/{asset_historical_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}assets/{asset_id}/historical/{asset_historical_id}", headers=self._token)
 
     def get_asset_subscription(self, asset_id: str):
         # TODO: Deprecated
-        return requests.get(f"{self._base_api_url}assets/{asset_id}/subscription", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}assets/{asset_id}/subscription", headers=self._token)
 
     def get_datapoints(self, aliases: str, start_epoch: int, end_epoch: int, brief=True):
         params = {"aliases": aliases, "startEpoch": start_epoch, "endEpoch": end_epoch, "brief": brief}
-        return requests.get(f"{self._base_api_url}datapoints", headers=self._token, params=params)
+        return self._transport.get(f"{self._base_api_url}datapoints", headers=self._token, params=params)
 
     def list_datastreams(self, limit: int=100, offset: int=0, asset_id: str=None, station_id: str=None):
         params = {"limit": limit, "offset": offset, "assetID": asset_id, "stationID": station_id}
-        return requests.get(f"{self._base_api_url}datastreams", headers=self._token, json=params)
+        return self._transport.get(f"{self._base_api_url}datastreams", headers=self._token, json=params)
 
     def update_datastream(self, datastream_id: str, profile: str="datastream", version: int=1):
         params = {"metadata": {"$profile": profile, "$version": version, "field": "Temp"}}
-        return requests.put(f"{self._base_api_url}datastreams/{datastream_id}", headers=self._token, json=params)
+        return self._transport.put(f"{self._base_api_url}datastreams/{datastream_id}", headers=self._token, json=params)
 
     def get_datastream(self, datastream_id: str):
-        return requests.get(f"{self._base_api_url}datastreams/{datastream_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}datastreams/{datastream_id}", headers=self._token)
 
     def list_datastream_historical(self, datastream_id: str, start_epoch: int, end_epoch: int):
         params = {"startEpoch": start_epoch, "endEpoch": end_epoch}
-        return requests.get(f"{self._base_api_url}datastreams/{datastream_id}/historical", headers=self._token, params=params)
+        return self._transport.get(f"{self._base_api_url}datastreams/{datastream_id}/historical", headers=self._token, params=params)
 
     def get_datastream_historical_by_id(self, datastream_id: str, datastream_historical_id: str):
-        return requests.get(f"{self._base_api_url}datastreams/{datastream_id}/historical/{datastream_historical_id}",
+        return self._transport.get(f"{self._base_api_url}datastreams/{datastream_id}/historical/{datastream_historical_id}",
                             headers=self._token)
 
     def update_datastream_metadata(self, datastream_id: str, metadata: dict):
-        return requests.put(f"{self._base_api_url}datastreams/{datastream_id}/metadata", headers=self._token, json=metadata)
+        return self._transport.put(f"{self._base_api_url}datastreams/{datastream_id}/metadata", headers=self._token, json=metadata)
     
     def get_datastream_datapoints(self, datastream_id: str, start_epoch: int, end_epoch: int, brief: bool=True, limit: int=100):
         params = {"startEpoch": start_epoch, "endEpoch": end_epoch, "brief": brief, "limit": limit}
-        return requests.get(f"{self._base_api_url}datastreams/{datastream_id}/datapoints", headers=self._token, params=params)
+        return self._transport.get(f"{self._base_api_url}datastreams/{datastream_id}/datapoints", headers=self._token, params=params)
     
     def get_datastream_datapoints_last(self, datastream_id: str):
-        return requests.get(f"{self._base_api_url}datastreams/{datastream_id}/datapoints/last", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}datastreams/{datastream_id}/datapoints/last", headers=self._token)
 
     def get_datastream_datapoints_count(self, datastream_id: str, start_epoch: int, end_epoch: int):
         params = {"startEpoch": start_epoch, "endEpoch": end_epoch}
-        return requests.get(f"{self._base_api_url}datastreams/{datastream_id}/datapoints/count", headers=self._token, params=params)
+        return self._transport.get(f"{self._base_api_url}datastreams/{datastream_id}/datapoints/count", headers=self._token, params=params)
 
     def count_datastreams(self, asset_id: str=None, station_id: str=None):
         params = {"assetID": asset_id, "stationID": station_id}
-        return requests.get(f"{self._base_api_url}datastreams/count", headers=self._token, params=params)
+        return self._transport.get(f"{self._base_api_url}datastreams/count", headers=self._token, params=params)
 
     def list_groups(self):
-        return requests.get(f"{self._base_api_url}groups", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}groups", headers=self._token)
 
     def create_group(self, metadata: dict):
-        return requests.post(f"{self._base_api_url}groups", headers=self._token, json=metadata)
+        return self._transport.post(f"{self._base_api_url}groups", headers=self._token, json=metadata)
 
     def get_group(self, group_id: str):
-        return requests.get(f"{self._base_api_url}groups/{group_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}groups/{group_id}", headers=self._token)
 
     def update_group(self, group_id: str, metadata: dict):
-        return requests.put(f"{self._base_api_url}groups/{group_id}", headers=self._token, json=metadata)
+        return self._transport.put(f"{self._base_api_url}groups/{group_id}", headers=self._token, json=metadata)
 
     def delete_group(self, group_id: str):
-        return requests.delete(f"{self._base_api_url}groups/{group_id}", headers=self._token)
+        return self._transport.delete(f"{self._base_api_url}groups/{group_id}", headers=self._token)
 
     def get_users_in_group(self, group_id: str):
-        return requests.get(f"{self._base_api_url}groups/{group_id}/users", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}groups/{group_id}/users", headers=self._token)
 
     def list_group_permissions(self, group_id: str):
-        return requests.get(f"{self._base_api_url}groups/{group_id}/permissions", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}groups/{group_id}/permissions", headers=self._token)
 
     def add_permission_to_group(self, group_id: str, permission_id: str):
-        return requests.put(f"{self._base_api_url}groups/{group_id}/permissions/{permission_id}", headers=self._token)
+        return self._transport.put(f"{self._base_api_url}groups/{group_id}/permissions/{permission_id}", headers=self._token)
 
     def remove_permission_from_group(self, group_id: str, permission_id: str):
-        return requests.delete(f"{self._base_api_url}groups/{group_id}/permissions/{permission_id}", headers=self._token)
+        return self._transport.delete(f"{self._base_api_url}groups/{group_id}/permissions/{permission_id}", headers=self._token)
 
     def list_measurement_classification_types(self, measurement_classification_type_id: str):
-        return requests.get(f"{self._measurement_api_url}measurement-types/{measurement_classification_type_id}", headers=self._token)
+        return self._transport.get(f"{self._measurement_api_url}measurement-types/{measurement_classification_type_id}", headers=self._token)
 
     def list_measurement_classification_systems(self):
-        return requests.get(f"{self._measurement_api_url}measurement-systems", headers=self._token)
+        return self._transport.get(f"{self._measurement_api_url}measurement-systems", headers=self._token)
 
     def get_measurement_classification_system_by_id(self, measurement_classification_system_id: str):
-        return requests.get(f"{self._measurement_api_url}measurement-systems/{measurement_classification_system_id}",
+        return self._transport.get(f"{self._measurement_api_url}measurement-systems/{measurement_classification_system_id}",
                             headers=self._token)
 
     def get_measurement_classification_conversions_by_id(self, measurement_classification_classification_id: str,
                                                          measurement_classification_source_uom_id: str,
                                                          measurement_classification_target_uom_id: str):
-        return requests.get(
+        return self._transport.get(
             f"{self._measurement_api_url}measurement-conversions/{measurement_classification_classification_id}/{measurement_classification_source_uom_id}/{measurement_classification_target_uom_id}",
             headers=self._token)
 
     def get_part(self, part_id: str):
-        return requests.get(f"{self._measurement_api_url}parts/{part_id}", headers=self._token)
+        return self._transport.get(f"{self._measurement_api_url}parts/{part_id}", headers=self._token)
 
     def get_organization_plan(self):
-        return requests.get(f"{self._base_api_url}plan", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}plan", headers=self._token)
 
     def get_reach_component_version_state(self, reach_component_id: str, reach_component_version_id: str):
-        return requests.get(
+        return self._transport.get(
             f"{self._base_api_url}reach-components/{reach_component_id}/versions/{reach_component_version_id}/state",
             headers=self._token)
 
     def list_station_groups(self):
-        return requests.get(f"{self._base_api_url}station-groups", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}station-groups", headers=self._token)
 
     def create_station_group(self, metadata):
-        return requests.post(f"{self._base_api_url}station-groups", headers=self._token, json=metadata)
+        return self._transport.post(f"{self._base_api_url}station-groups", headers=self._token, json=metadata)
 
     def get_station_group(self, station_group_id: str):
-        return requests.get(f"{self._base_api_url}station-groups/{station_group_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}station-groups/{station_group_id}", headers=self._token)
 
     def update_station(self, station_group_id: str, metadata: dict):
-        return requests.put(f"{self._base_api_url}station-groups/{station_group_id}", headers=self._token, json=metadata)
+        return self._transport.put(f"{self._base_api_url}station-groups/{station_group_id}", headers=self._token, json=metadata)
 
     def delete_station_group(self, station_group_id: str):
-        return requests.delete(f"{self._base_api_url}station-groups/{station_group_id}", headers=self._token)
+        return self._transport.delete(f"{self._base_api_url}station-groups/{station_group_id}", headers=self._token)
 
     def update_station_group_metadata(self, station_group_id: str, metadata: dict):
-        return requests.put(f"{self._base_api_url}station-groups/{station_group_id}/metadata", headers=self._token, json=metadata)
+        return self._transport.put(f"{self._base_api_url}station-groups/{station_group_id}/metadata", headers=self._token, json=metadata)
 
     def list_stations(self):
-        return requests.get(f"{self._base_api_url}stations", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}stations", headers=self._token)
 
     def create_station(self, metadata: dict):
-        return requests.post(f"{self._base_api_url}stations", headers=self._token, json=metadata)
+        return self._transport.post(f"{self._base_api_url}stations", headers=self._token, json=metadata)
 
     def get_station(self, station_id: str):
-        return requests.get(f"{self._base_api_url}stations/{station_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}stations/{station_id}", headers=self._token)
 
     def delete_station(self, station_id: str):
-        return requests.delete(f"{self._base_api_url}stations/{station_id}", headers=self._token)
+        return self._transport.delete(f"{self._base_api_url}stations/{station_id}", headers=self._token)
 
     def get_station_state(self, station_id: str):
-        return requests.get(f"{self._base_api_url}stations/{station_id}/state", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}stations/{station_id}/state", headers=self._token)
 
     def list_station_historical(self, station_id: str, start_epoch: int, end_epoch: int):
         params = {'start_epoch': start_epoch, "endEpoch": end_epoch}
-        return requests.get(f"{self._base_api_url}stations/{station_id}/historical", headers=self._token, params=params)
+        return self._transport.get(f"{self._base_api_url}stations/{station_id}/historical", headers=self._token, params=params)
 
     def get_station_historical_by_id(self, station_id: str, station_historical_id: str):
-        return requests.get(f"{self._base_api_url}stations/{station_id}/historical/{station_historical_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}stations/{station_id}/historical/{station_historical_id}", headers=self._token)
 
     def update_station_metadata(self, station_id: str, metadata: dict):
-        return requests.put(f"{self._base_api_url}stations/{station_id}/metadata", headers=self._token, json=metadata)
+        return self._transport.put(f"{self._base_api_url}stations/{station_id}/metadata", headers=self._token, json=metadata)
 
     def list_subscriptions(self):
-        return requests.get(f"{self._base_api_url}subscriptions", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}subscriptions", headers=self._token)
 
     def create_subscriptions(self, po_number: str, subscriptions: list):
-        return requests.post(f"{self._base_api_url}subscriptions", headers=self._token,
+        return self._transport.post(f"{self._base_api_url}subscriptions", headers=self._token,
                              json={"po_number": po_number, "organization_id": self._organization_id,
                                    "subscriptions": subscriptions})
 
     def get_subscription(self, subscription_id: str):
-        return requests.get(f"{self._base_api_url}subscriptions/{subscription_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}subscriptions/{subscription_id}", headers=self._token)
 
     def update_subscription(self, subscription_id: str, auto_renew: bool, renewal_part: str):
         json_params = {"auto_renew": auto_renew, "renewal_part": renewal_part}
-        return requests.put(f"{self._base_api_url}subscriptions/{subscription_id}", headers=self._token,
+        return self._transport.put(f"{self._base_api_url}subscriptions/{subscription_id}", headers=self._token,
                             json=json_params)
 
     def delete_subscription(self, subscription_id: str):
-        return requests.delete(f"{self._base_api_url}subscriptions/{subscription_id}", headers=self._token)
+        return self._transport.delete(f"{self._base_api_url}subscriptions/{subscription_id}", headers=self._token)
 
     def upgrade_subscription_part(self, subscription_id: str, part_id: str):
-        return requests.put(f"{self._base_api_url}subscriptions/{subscription_id}/parts/{part_id}", headers=self._token)
+        return self._transport.put(f"{self._base_api_url}subscriptions/{subscription_id}/parts/{part_id}", headers=self._token)
 
     def create_token(self, username: str, password: str, client_id: str, grant_type: str):
-        return requests.post(f"{self._token_api_url}",
+        return self._transport.post(f"{self._token_api_url}",
                              json={"username": username, "password": password, "client_id": client_id,
                                    "grant_type": grant_type})
 
     def refresh_token(self):
-        return requests.put(f"{self._token_api_url}", headers=self._token, json={"refresh_token": ""})
+        return self._transport.put(f"{self._token_api_url}", headers=self._auth_header or {},
+                                   json={"refresh_token": self._raw_refresh_token or ""})
 
     def list_users(self):
-        return requests.get(f"{self._base_api_url}users", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}users", headers=self._token)
 
     def create_user(self, metadata):
-        return requests.post(f"{self._base_api_url}users", headers=self._token, json={"metadata": metadata})
+        return self._transport.post(f"{self._base_api_url}users", headers=self._token, json={"metadata": metadata})
 
     def get_user(self, user_id: str):
-        return requests.get(f"{self._base_api_url}users/{user_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}users/{user_id}", headers=self._token)
 
     def update_user(self, user_id: str, metadata: dict):
-        return requests.put(f"{self._base_api_url}users/{user_id}", headers=self._token, json={"metadata": metadata})
+        return self._transport.put(f"{self._base_api_url}users/{user_id}", headers=self._token, json={"metadata": metadata})
 
     def delete_user(self, user_id: str):
-        return requests.delete(f"{self._base_api_url}users/{user_id}", headers=self._token)
+        return self._transport.delete(f"{self._base_api_url}users/{user_id}", headers=self._token)
 
     def list_user_groups(self, user_id: str):
-        return requests.get(f"{self._base_api_url}users/{user_id}/groups", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}users/{user_id}/groups", headers=self._token)
 
     def count_user_groups(self, user_id: str):
-        return requests.get(f"{self._base_api_url}users/{user_id}/groups/count", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}users/{user_id}/groups/count", headers=self._token)
 
     def add_user_to_group(self, user_id: str, group_id: str):
-        return requests.put(f"{self._base_api_url}users/{user_id}/groups/{group_id}", headers=self._token)
+        return self._transport.put(f"{self._base_api_url}users/{user_id}/groups/{group_id}", headers=self._token)
 
     def remove_user_from_group(self, user_id: str, group_id: str):
-        return requests.delete(f"{self._base_api_url}users/{user_id}/groups/{group_id}", headers=self._token)
+        return self._transport.delete(f"{self._base_api_url}users/{user_id}/groups/{group_id}", headers=self._token)
 
     def list_variables(self):
-        return requests.get(f"{self._base_api_url}variables", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}variables", headers=self._token)
 
     def create_variable(self, name: str, metadata: dict):
-        return requests.post(f"{self._base_api_url}variables", headers=self._token, json={"name": name, "metadata": metadata})
+        return self._transport.post(f"{self._base_api_url}variables", headers=self._token, json={"name": name, "metadata": metadata})
 
     def list_alert_configurations(self):
-        return requests.get(f"{self._base_api_url}alert-configurations", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}alert-configurations", headers=self._token)
 
     def create_alert_configuration(self):
         params = {"$profile": "configuration", "$version": 1}
-        return requests.post(f"{self._base_api_url}alert-configurations", headers=self._token, json=params)
+        return self._transport.post(f"{self._base_api_url}alert-configurations", headers=self._token, json=params)
 
     def get_alert_configuration(self, alert_id: str):
-        return requests.get(f"{self._base_api_url}alert-configurations/{alert_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}alert-configurations/{alert_id}", headers=self._token)
 
     def update_alert_configuration(self, alert_id: str,  metadata: dict):
         json_params = {"$profile": "configuration", "$version": 1}
         json_params.update(metadata)
-        return requests.put(f"{self._base_api_url}alert-configuration/{alert_id}", headers=self._token, json=json_params)
+        return self._transport.put(f"{self._base_api_url}alert-configuration/{alert_id}", headers=self._token, json=json_params)
 
     def delete_alert_configuration(self, alert_id: str):
-        return requests.delete(f"{self._base_api_url}alert-configurations/{alert_id}", headers=self._token)
+        return self._transport.delete(f"{self._base_api_url}alert-configurations/{alert_id}", headers=self._token)
 
     def list_alert_configuration_historical(self, alert_id: str, end_epoch: int, start_epoch: int=0, offset: int=0, limit: int=100):
         params = {"startEpoch": start_epoch, "endEpoch": end_epoch, "offset": offset, "limit": limit}
-        return requests.get(f"{self._base_api_url}alert-configurations/{alert_id}/historical", headers=self._token, params=params)
+        return self._transport.get(f"{self._base_api_url}alert-configurations/{alert_id}/historical", headers=self._token, params=params)
 
     def get_alert_configuration_historical(self, alert_id: str, alert_historical_id: str):
-        return requests.get(f"{self._base_api_url}alert-configurations/{alert_id}/historical/{alert_historical_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}alert-configurations/{alert_id}/historical/{alert_historical_id}", headers=self._token)
 
     def list_alert_events(self, alert_filter: str, end_epoch: int, start_epoch: int=0, offset: int=0):
         params = {"startEpoch": start_epoch, "endEpoch": end_epoch, "offset": offset, "filter": alert_filter}
-        return requests.get(f"{self._base_api_url}/alert-events", headers=self._token, params=params)
+        return self._transport.get(f"{self._base_api_url}alert-events", headers=self._token, params=params)
 
     def get_alert_events_id(self, alert_event_id: str):
-        return requests.get(f"{self._base_api_url}alert-events/{alert_event_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}alert-events/{alert_event_id}", headers=self._token)
 
     def search_alert_events(self, filters: dict):
-        return requests.post(f"{self._base_api_url}alert_events/search", headers=self._token, json=filters)
+        return self._transport.post(f"{self._base_api_url}alert_events/search", headers=self._token, json=filters)
 
     def list_alert_logs(self, alert_filter: str, end_epoch: int, start_epoch: int=0, offset: int=0, limit: int=100):
         params = {"startEpoch": start_epoch, "endEpoch": end_epoch, "offset": offset, "limit": limit, "filter": alert_filter}
-        return requests.get(f"{self._base_api_url}alert-logs", headers=self._token, params=params)
+        return self._transport.get(f"{self._base_api_url}alert-logs", headers=self._token, params=params)
 
     def create_alert_log(self, alert_event_id: str, metadata: dict):
         json_params = {"alert_event_id": alert_event_id}
         json_params.update(metadata)
-        return requests.post(f"{self._base_api_url}alert-logs", headers=self._token, json=json_params)
+        return self._transport.post(f"{self._base_api_url}alert-logs", headers=self._token, json=json_params)
 
     def get_alert_logs_id(self, alert_log_id: str):
-        return requests.get(f"{self._base_api_url}alert-logs/{alert_log_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}alert-logs/{alert_log_id}", headers=self._token)
 
     def search_alert_logs(self, filters: dict):
-        return requests.post(f"{self._base_api_url}alert-log/search", headers=self._token, json=filters)
+        return self._transport.post(f"{self._base_api_url}alert-log/search", headers=self._token, json=filters)
 
     def update_asset_software(self, asset_id: str, software_type: str, os_metadata: dict=dict, program_metadata: dict=dict):
         headers = {"x-campbell-software-type": software_type}
@@ -360,144 +2364,321 @@ class CampbellCloud:
         else:
             raise SyntaxError("software_type can only be 'datalogger-os' or 'datalogger-program'. Along with passing the appropriate metadata parameter.")
 
-        return requests.put(f"{self._base_api_url}assets/{asset_id}/software-packages", headers=headers, json=json_params)
+        return self._transport.put(f"{self._base_api_url}assets/{asset_id}/software-packages", headers=headers, json=json_params)
 
     def execute_asset_command(self, asset_id: str, command: str, start_epoch: int, end_epoch: int, table: str):
         json_params = {"command": command, "parameters": {"startEpoch": start_epoch, "endEpoch": end_epoch, "table": table}}
-        return requests.put(f"{self._base_api_url}assets/{asset_id}/commands", headers=self._token, json=json_params)
+        return self._transport.put(f"{self._base_api_url}assets/{asset_id}/commands", headers=self._token, json=json_params)
 
     def list_exports(self):
-        return requests.get(f"{self._base_api_url}exports", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}exports", headers=self._token)
 
     def list_dashboards(self, before: str=str, after: str=str, first: int=100, last: int=100, brief: bool=True, latest: bool=True):
         params = {"before": before, "after": after, "first": first, "last": last, "brief": brief, "latest": latest}
-        return requests.get(f"{self._base_api_url}dashboards", headers=self._token, params=params)
+        return self._transport.get(f"{self._base_api_url}dashboards", headers=self._token, params=params)
 
     def create_dashboard(self, metadata: dict):
-        return requests.post(f"{self._base_api_url}dashboards", headers=self._token, json=metadata)
+        return self._transport.post(f"{self._base_api_url}dashboards", headers=self._token, json=metadata)
 
     def get_dashboard(self, dashboard_id: str, latest: bool=True):
         params = {"latest": latest}
-        return requests.get(f"{self._base_api_url}dashboards/{dashboard_id}", headers=self._token, params=params)
+        return self._transport.get(f"{self._base_api_url}dashboards/{dashboard_id}", headers=self._token, params=params)
 
     def update_dashboard(self, dashboard_id: str, metadata: dict):
-        return requests.put(f"{self._base_api_url}dashboards/{dashboard_id}", headers=self._token, json=metadata)
+        return self._transport.put(f"{self._base_api_url}dashboards/{dashboard_id}", headers=self._token, json=metadata)
 
     def delete_dashboard(self, dashboard_id: str):
-        return requests.delete(f"{self._base_api_url}dashboard/{dashboard_id}", headers=self._token)
+        return self._transport.delete(f"{self._base_api_url}dashboard/{dashboard_id}", headers=self._token)
 
     def list_dashboard_historical(self, dashboard_id: str, before: str=None, after: str=None, first: int=100, last: int=100, reverse: bool=None, brief: bool=None):
         params = {"before": before, "after": after, "first": first, "last": last, "reverse": reverse, "brief": brief}
-        return requests.get(f"{self._base_api_url}dashboards/{dashboard_id}/historical", headers=self._token, params=params)
+        return self._transport.get(f"{self._base_api_url}dashboards/{dashboard_id}/historical", headers=self._token, params=params)
 
     def get_dashboard_historical_by_id(self, dashboard_id: str, dashboard_historical_id: str):
-        return requests.get(f"{self._base_api_url}dashboards/{dashboard_id}/historical/{dashboard_historical_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}dashboards/{dashboard_id}/historical/{dashboard_historical_id}", headers=self._token)
 
     def list_data_collections(self):
-        return requests.get(f"{self._base_api_url}data-collections/collections", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}data-collections/collections", headers=self._token)
 
     def create_data_collections(self, metadata: dict):
-        return requests.post(f"{self._base_api_url}data-collections/collections", headers=self._token, json=metadata)
+        return self._transport.post(f"{self._base_api_url}data-collections/collections", headers=self._token, json=metadata)
 
     def get_data_collection(self, data_collection_id: str):
-        return requests.get(f"{self._base_api_url}data-collections/collections/{data_collection_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}data-collections/collections/{data_collection_id}", headers=self._token)
 
     def update_data_collection(self, data_collection_id: str, metadata: dict):
-        return requests.put(f"{self._base_api_url}data-collections/collections/{data_collection_id}", headers=self._token, json=metadata)
+        return self._transport.put(f"{self._base_api_url}data-collections/collections/{data_collection_id}", headers=self._token, json=metadata)
 
     def delete_data_collection(self, data_collection_id: str):
-        return requests.delete(f"{self._base_api_url}data-collections/collections/{data_collection_id}", headers=self._token)
+        return self._transport.delete(f"{self._base_api_url}data-collections/collections/{data_collection_id}", headers=self._token)
 
     def list_data_collection_types(self):
-        return requests.get(f"{self._base_api_url}data-collections/types", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}data-collections/types", headers=self._token)
 
     def create_data_collection_type(self, metadata: dict):
-        return requests.post(f"{self._base_api_url}data-collections/types", headers=self._token, json=metadata)
+        return self._transport.post(f"{self._base_api_url}data-collections/types", headers=self._token, json=metadata)
 
     def get_data_collection_type(self, data_collection_type_id: str):
-        return requests.get(f"{self._base_api_url}data-collections/types/{data_collection_type_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}data-collections/types/{data_collection_type_id}", headers=self._token)
 
     def update_data_collection_type(self, data_collection_type_id: str, metadata: dict):
-        return requests.put(f"{self._base_api_url}data-collections/types/{data_collection_type_id}", headers=self._token, json=metadata)
+        return self._transport.put(f"{self._base_api_url}data-collections/types/{data_collection_type_id}", headers=self._token, json=metadata)
 
     def delete_data_collection_type(self, data_collection_type_id: str):
-        return requests.delete(f"{self._base_api_url}data-collections/types/{data_collection_type_id}", headers=self._token)
+        return self._transport.delete(f"{self._base_api_url}data-collections/types/{data_collection_type_id}", headers=self._token)
 
     def list_data_collection_type_historical(self, data_collection_type_id: str):
-        return requests.get(f"{self._base_api_url}data-collections/types/{data_collection_type_id}/historical", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}data-collections/types/{data_collection_type_id}/historical", headers=self._token)
 
     def list_datastreams_labels(self, limit: int=1000, start_after: str=None):
         params = {"limit": limit, "startAfter": start_after}
-        return requests.get(f"{self._base_api_url}datastreams/labels", headers=self._token, params=params)
+        return self._transport.get(f"{self._base_api_url}datastreams/labels", headers=self._token, params=params)
 
     def list_distribution_groups(self):
-        return requests.get(f"{self._base_api_url}distribution-groups", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}distribution-groups", headers=self._token)
 
     def create_distribution_groups(self, metadata: dict):
-        return requests.post(f"{self._base_api_url}distribution-groups", headers=self._token, json=metadata)
+        return self._transport.post(f"{self._base_api_url}distribution-groups", headers=self._token, json=metadata)
 
     def get_distribution_group(self, distribution_group_id: str):
-        return requests.get(f"{self._base_api_url}distribution-groups/{distribution_group_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}distribution-groups/{distribution_group_id}", headers=self._token)
 
     def update_distribution_group(self, distribution_group_id: str, metadata: dict):
-        return requests.put(f"{self._base_api_url}distributions-groups/{distribution_group_id}", headers=self._token, json=metadata)
+        return self._transport.put(f"{self._base_api_url}distributions-groups/{distribution_group_id}", headers=self._token, json=metadata)
 
     def delete_distribution_group(self, distribution_group_id: str):
-        return requests.delete(f"{self._base_api_url}distributions-groups/{distribution_group_id}", headers=self._token)
+        return self._transport.delete(f"{self._base_api_url}distributions-groups/{distribution_group_id}", headers=self._token)
 
     def create_export(self, metadata: dict):
-        return requests.post(f"{self._base_api_url}exports", headers=self._token, json=metadata)
+        return self._transport.post(f"{self._base_api_url}exports", headers=self._token, json=metadata)
 
     def get_export(self, export_id: str):
-        return requests.get(f"{self._base_api_url}exports/{export_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}exports/{export_id}", headers=self._token)
 
     def update_export(self, export_id: str, metadata: dict):
-        return requests.put(f"{self._base_api_url}exports/{export_id}", headers=self._token, json=metadata)
+        return self._transport.put(f"{self._base_api_url}exports/{export_id}", headers=self._token, json=metadata)
 
     def delete_export(self, export_id: str):
-        return requests.delete(f"{self._base_api_url}exports/{export_id}", headers=self._token)
+        return self._transport.delete(f"{self._base_api_url}exports/{export_id}", headers=self._token)
 
     def list_export_jobs(self, export_id: str):
-        return requests.get(f"{self._base_api_url}exports/{export_id}/jobs", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}exports/{export_id}/jobs", headers=self._token)
 
     def get_export_job(self, export_id: str, export_job_id: str):
-        return requests.get(f"{self._base_api_url}exports/{export_id}/jobs/{export_job_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}exports/{export_id}/jobs/{export_job_id}", headers=self._token)
 
     def delete_export_job(self, export_id: str, export_job_id: str):
-        return requests.delete(f"{self._base_api_url}exports/{export_id}/jobs/{export_job_id}", headers=self._token)
+        return self._transport.delete(f"{self._base_api_url}exports/{export_id}/jobs/{export_job_id}", headers=self._token)
 
     def list_export_job_files(self, export_id: str, export_job_id: str):
-        return requests.get(f"{self._base_api_url}exports/{export_id}/jobs/{export_job_id}/files", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}exports/{export_id}/jobs/{export_job_id}/files", headers=self._token)
 
     def get_export_job_file(self, export_id: str, export_job_id: str, export_file_id: str):
-        return requests.get(f"{self._base_api_url}exports/{export_id}/jobs/{export_job_id}/files/{export_file_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}exports/{export_id}/jobs/{export_job_id}/files/{export_file_id}", headers=self._token)
 
     def get_group_permission_by_id(self, group_id: str, permission_id: str):
-        return requests.get(f"{self._base_api_url}groups/{group_id}/permissions/{permission_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}groups/{group_id}/permissions/{permission_id}", headers=self._token)
 
     def switch_organization(self, new_organization_id: str):
         metadata = {"organization_id": new_organization_id}
-        return requests.put(f"{self._base_api_url}switch", headers=self._token, json=metadata)
+        return self._transport.put(f"{self._base_api_url}switch", headers=self._token, json=metadata)
 
     def list_organizations(self):
-        return requests.get("https://us-west-2.campbell-cloud.com/api/v1/organizations", headers=self._token)
+        return self._transport.get(f"{self._api_url}organizations", headers=self._token)
 
     def create_product_registration(self, content: str, signature: str, signature_alg: str, nonce: str):
         metadata = {"content": content, "signature": signature, "signature_alg": signature_alg, "nonce": nonce}
-        return requests.post(f"{self._product_api_url}", headers=self._token, json=metadata)
+        return self._transport.post(f"{self._product_api_url}", headers=self._token, json=metadata)
 
     def export_reach_component(self, reach_component_id: str, reach_component_version_id: str):
-        return requests.get(f"{self._base_api_url}reach-components/{reach_component_id}/versions/{reach_component_version_id}/export", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}reach-components/{reach_component_id}/versions/{reach_component_version_id}/export", headers=self._token)
 
     def preflight_create_station(self):
-        return requests.options(f"{self._base_api_url}stations", headers=self._token)
+        return self._transport.options(f"{self._base_api_url}stations", headers=self._token)
 
     def get_subscription_claim(self, billing_transaction_id: str):
-        return requests.get(f"{self._base_api_url}subscriptions-claims/{billing_transaction_id}", headers=self._token)
+        return self._transport.get(f"{self._base_api_url}subscriptions-claims/{billing_transaction_id}", headers=self._token)
 
     def update_subscription_claims(self, billing_transaction_id: str, subscription_ids: list):
         metadata = {"subscription_ids": subscription_ids}
-        return requests.put(f"{self._base_api_url}subscriptions-claims/{billing_transaction_id}", headers=self._token, json=metadata)
+        return self._transport.put(f"{self._base_api_url}subscriptions-claims/{billing_transaction_id}", headers=self._token, json=metadata)
 
     def get_subscription_organization(self):
-        return requests.get(f"{self._base_api_url}subscription-organization", headers=self._token)
\ No newline at end of file
+        return self._transport.get(f"{self._base_api_url}subscription-organization", headers=self._token)
+
+
+# Async setup
+def async_endpoint(name):
+    async def method(self, *args, **kwargs):
+        async with self._limiter:
+            loop = asyncio.get_running_loop()
+            call = functools.partial(getattr(self._client, name), *args, **kwargs)
+            return await loop.run_in_executor(self._executor, call)
+    method.__name__ = name
+    method.__qualname__ = f"AsyncCampbellCloud.{name}"
+    return method
+
+def async_all_methods(cls):
+    for name in CampbellCloud._endpoints:
+        setattr(cls, name, async_endpoint(name))
+    return cls
+
+
+@async_all_methods
+class AsyncCampbellCloud:
+
+    def __init__(self, organization_id: str, username: str, password: str, max_concurrency: int=10,
+                 client: CampbellCloud=None, api_url: str=DEFAULT_API_URL):
+        self._owns_client = client is None
+        if client is None:
+            self._transport = Transport(pool_connections=1, pool_maxsize=max_concurrency, pool_block=True)
+            client = CampbellCloud(organization_id, username, password, transport=self._transport, api_url=api_url)
+        self._client = client
+        self._max_concurrency = max_concurrency
+        self._limiter = asyncio.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="campbellcloud")
+
+    @classmethod
+    def from_client(cls, client: CampbellCloud, max_concurrency: int=10):
+        return cls(client._organization_id, client._username, client._password, max_concurrency, client=client)
+
+    @property
+    def client(self):
+        return self._client
+
+    @property
+    def max_concurrency(self):
+        return self._max_concurrency
+
+    async def close(self):
+        # In-flight calls are waited for in a worker thread so the event loop keeps running meanwhile
+        await asyncio.to_thread(self._executor.shutdown, wait=True)
+        if self._owns_client:
+            self._client.close()
+            self._transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+
+# Pool setup
+OrganizationResult = namedtuple("OrganizationResult", ["organization_id", "region", "result", "error", "status_code"],
+                                defaults=[None])
+
+
+class ClientPool:
+    # One login per region and one connection pool shared by every organization handle
+
+    def __init__(self, username: str, password: str, regions: dict=None, transport: Transport=None,
+                 max_workers: int=8, refresh_margin: float=60.0, middleware: list=None):
+        self._username = username
+        self._password = password
+        self.max_workers = max_workers
+        self._owns_transport = transport is None
+        self._transport = Transport(pool_maxsize=max_workers * 2) if transport is None else transport
+        self._identities = {region: CampbellCloud(None, username, password, transport=self._transport,
+                                                  refresh_margin=refresh_margin, middleware=middleware,
+                                                  api_url=api_url)
+                            for region, api_url in (regions or {"us-west-2": DEFAULT_API_URL}).items()}
+        self._clients = {}
+        self._organizations = None
+        self._lock = threading.Lock()
+
+    @property
+    def transport(self):
+        return self._transport
+
+    @property
+    def regions(self):
+        return tuple(self._identities)
+
+    def client(self, organization_id: str, region: str=None):
+        region = self._region(region)
+        key = (region, organization_id)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = self._identities[region].for_organization(organization_id)
+        return client
+
+    def organizations(self, refresh: bool=False):
+        # Discovers every organization visible to the identity in every region, as (region, organization_id) pairs
+        if self._organizations is None or refresh:
+            organizations = []
+            for region, identity in self._identities.items():
+                result = identity.list_organizations()
+                status_code = identity.last_status_code
+                # A failed discovery is raised and never cached, an error body would read as no organizations
+                if (status_code is not None and status_code >= 400) or not is_page(result):
+                    raise ResponseError(f"Organizations of region {region} could not be listed: {result}", result)
+                for record in page_records(result):
+                    organization_id = record_cursor(record, "id", "organization_id")
+                    if organization_id is not None:
+                        organizations.append((region, organization_id))
+            self._organizations = organizations
+        return list(self._organizations)
+
+    def fan_out(self, method: str, *args, organizations=None, **kwargs):
+        # Calls the endpoint for every organization concurrently and returns one OrganizationResult per organization
+        if method not in CampbellCloud._endpoints:
+            raise ValueError(f"{method} is not a CampbellCloud endpoint.")
+        targets = [self._target(organization) for organization in
+                   (self.organizations() if organizations is None else organizations)]
+
+        def call(target):
+            region, organization_id = target
+            client = self.client(organization_id, region)
+            try:
+                result = getattr(client, method)(*args, **kwargs)
+            except Exception as error:
+                return OrganizationResult(organization_id, region, None, error)
+            return OrganizationResult(organization_id, region, result, None, client.last_status_code)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="campbellcloud-pool") as pool:
+            return list(pool.map(call, targets))
+
+    def fan_out_records(self, method: str, *args, organizations=None, is_failure=bulk_failed, **kwargs):
+        # Merges the records of every organization into one list, each tagged with its organization and region
+        records = []
+        for item in self.fan_out(method, *args, organizations=organizations, **kwargs):
+            if item.error is not None:
+                raise item.error
+            # An error body would otherwise read as an organization without records
+            if ((item.status_code is not None and item.status_code >= 400) or not is_page(item.result) or
+                    (is_failure and is_failure(item.result))):
+                raise ResponseError(f"{method} failed for organization {item.organization_id}: {item.result}",
+                                    item.result)
+            for record in page_records(item.result):
+                if isinstance(record, dict):
+                    record = dict(record, organization_id=item.organization_id, region=item.region)
+                records.append(record)
+        return records
+
+    def _region(self, region: str | None):
+        if region is None:
+            if len(self._identities) > 1:
+                raise ValueError("region is required when the pool spans several regions.")
+            return next(iter(self._identities))
+        if region not in self._identities:
+            raise ValueError(f"{region} is not a region of this pool.")
+        return region
+
+    def _target(self, organization):
+        if isinstance(organization, tuple):
+            return self._region(organization[0]), organization[1]
+        return self._region(None), organization
+
+    def close(self):
+        for identity in self._identities.values():
+            identity.close()
+        if self._owns_transport:
+            self._transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,15 @@
+import pytest
+
+from mock_server import MockData, MockServer
+
+
+@pytest.fixture
+def server():
+    with MockServer(data=MockData(points=5000)) as server:
+        yield server
+
+
+@pytest.fixture
+def client(server):
+    with server.client() as client:
+        yield client
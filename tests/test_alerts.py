@@ -0,0 +1,29 @@
+import time
+
+import pytest
+
+from pycampbellcloud import AlertWatcher, ResponseError
+
+
+def test_new_events_are_delivered_once(server, client):
+    start_epoch = int(time.time() * 1000) - 1000
+    server.data.raise_alert("station-offline")
+    watcher = AlertWatcher(client, "station-offline", start_epoch=start_epoch, min_interval=0.01)
+    assert len(watcher.poll()) == 1
+    server.data.raise_alert("station-offline")
+    assert len(watcher.poll()) == 1
+    assert watcher.stats()["delivered"] == 2
+
+
+def test_error_body_raises_with_the_result_and_keeps_the_cursor(server, client):
+    client.get_organization_plan()
+    watcher = AlertWatcher(client, "station-offline", min_interval=0.01)
+    cursors = watcher.cursors
+    server.throttle([503])
+    with pytest.raises(ResponseError) as raised:
+        watcher._fetch("station-offline", cursors["station-offline"], int(time.time() * 1000))
+    assert raised.value.result == {"message": "Service Unavailable"}
+    server.throttle([503])
+    assert watcher.poll() == []
+    assert watcher.cursors == cursors
+    assert watcher.stats()["errors"] == 1
@@ -0,0 +1,28 @@
+import asyncio
+
+from pycampbellcloud import AsyncCampbellCloud
+
+
+def test_close_does_not_block_the_event_loop(server):
+    server.latency = 0.3
+
+    async def scenario():
+        client = AsyncCampbellCloud("org-0", "mock-user", "mock-password", api_url=server.api_url)
+        call = asyncio.create_task(client.get_station("st-0001"))
+        await asyncio.sleep(0.05)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticking = asyncio.create_task(ticker())
+        await client.close()
+        ticking.cancel()
+        return await call, ticks
+
+    result, ticks = asyncio.run(scenario())
+    assert result["id"] == "st-0001"
+    assert ticks > 5
@@ -0,0 +1,85 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from mock_server import MockData, MockServer
+from pycampbellcloud import CampbellCloud
+
+
+@pytest.fixture
+def auth_server():
+    with MockServer(data=MockData(points=100), latency=0.01, authenticate=True) as server:
+        yield server
+
+
+def test_concurrent_first_use_requests_one_token(auth_server):
+    with auth_server.client() as client:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(lambda _: client.list_stations(), range(32)))
+    assert all(isinstance(result, list) for result in results)
+    assert auth_server.token_requests == ["password"]
+
+
+def test_token_is_renewed_at_refresh_margin(auth_server):
+    auth_server.token_lifetime = 1.0
+    with auth_server.client(refresh_margin=0.5) as client:
+        client.list_stations()
+        client.list_stations()
+        assert auth_server.token_requests == ["password"]
+        time.sleep(0.6)
+        assert isinstance(client.list_stations(), list)
+    assert auth_server.token_requests == ["password", "refresh_token"]
+    assert 401 not in auth_server.stats()["status_counts"]
+
+
+def test_failed_refresh_falls_back_to_password(auth_server):
+    auth_server.token_lifetime = 1.0
+    with auth_server.client(refresh_margin=0.5) as client:
+        client.list_stations()
+        time.sleep(0.6)
+        auth_server.revoke_tokens(refresh=True)
+        assert isinstance(client.list_stations(), list)
+    assert auth_server.token_requests == ["password", "refresh_token", "password"]
+
+
+def test_rejected_token_is_replaced_and_the_request_replayed(auth_server):
+    with auth_server.client() as client:
+        client.list_stations()
+        auth_server.revoke_tokens()
+        auth_server.reset_stats()
+        assert isinstance(client.list_stations(), list)
+        assert client.last_status_code == 200
+    assert auth_server.token_requests == ["password", "password"]
+    assert auth_server.stats()["status_counts"] == {401: 1, 200: 2}
+
+
+def test_rejected_stream_is_replayed(auth_server):
+    end_epoch = auth_server.data.end_epoch
+    with auth_server.client() as client:
+        client.list_stations()
+        auth_server.revoke_tokens()
+        points = list(client.stream_datastream_datapoints("ds-00001", end_epoch - 9 * 60_000, end_epoch))
+    assert len(points) == 10
+    assert auth_server.token_requests == ["password", "password"]
+
+
+def test_rejected_credentials_are_not_replayed(auth_server):
+    with CampbellCloud("org-0", "mock-user", "wrong-password", api_url=auth_server.api_url) as client:
+        with pytest.raises(SyntaxError):
+            client.list_stations()
+        assert client.create_token("mock-user", "wrong-password", "cloud", "password")["message"] == "Unauthorized"
+        assert client.last_status_code == 401
+    assert auth_server.token_requests == ["password", "password"]
+    assert auth_server.stats()["status_counts"] == {401: 2}
+
+
+def test_rejected_refresh_token_is_not_replayed(auth_server):
+    with auth_server.client() as client:
+        client.list_stations()
+        auth_server.revoke_tokens(refresh=True)
+        auth_server.reset_stats()
+        assert client.refresh_token()["message"] == "Unauthorized"
+        assert client.last_status_code == 401
+    assert auth_server.token_requests == ["password", "refresh_token"]
+    assert auth_server.stats()["status_counts"] == {401: 1}
@@ -0,0 +1,23 @@
+import pytest
+
+from pycampbellcloud import DatapointBatchPlanner, ResponseError
+
+
+def test_batches_match_per_datastream_requests(server, client):
+    end_epoch = server.data.end_epoch
+    aliases = [f"alias-{index:05d}" for index in range(5)]
+    planner = DatapointBatchPlanner(client, max_aliases=2)
+    assert len(planner.plan(aliases, end_epoch - 9 * 60_000, end_epoch)) == 3
+    points = planner.fetch(aliases, end_epoch - 9 * 60_000, end_epoch)
+    for alias in aliases:
+        assert points[alias] == client.get_datastream_datapoints(alias, end_epoch - 9 * 60_000, end_epoch)["data"]
+
+
+def test_error_body_raises_with_the_result(server, client):
+    end_epoch = server.data.end_epoch
+    client.get_organization_plan()
+    server.throttle([503])
+    planner = DatapointBatchPlanner(client)
+    with pytest.raises(ResponseError) as raised:
+        planner.fetch_batch(["alias-00001", "alias-00002"], end_epoch - 9 * 60_000, end_epoch)
+    assert raised.value.result == {"message": "Service Unavailable"}
@@ -0,0 +1,53 @@
+import threading
+import time
+
+from pycampbellcloud import BulkExecutor, BulkOperation
+
+
+def test_json_error_responses_are_failures(server, client):
+    client.get_organization_plan()
+    server.throttle([429, 429, 429])
+    operations = [BulkOperation("get_station", (f"st-{index:04d}",)) for index in range(6)]
+    results = list(client.bulk(operations, max_workers=1))
+    failed = [item for item in results if item.status_code == 429]
+    assert len(failed) == 3
+    assert all(item.result == {"message": "Too Many Requests"} for item in failed)
+    assert [item.status_code for item in results[3:]] == [200, 200, 200]
+
+
+def test_max_failures_stops_on_json_error_responses(server, client):
+    client.get_organization_plan()
+    server.throttle([429])
+    operations = [BulkOperation("get_station", (f"st-{index:04d}",)) for index in range(20)]
+    results = list(client.bulk(operations, max_workers=1, max_failures=1))
+    assert len(results) < 20
+    assert results[-1].status_code == 429
+
+
+class SlowHeadClient:
+    # Stand-in client whose first operation blocks until released
+    _endpoints = ("get_station",)
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = 0
+        self.last_status_code = 200
+
+    def get_station(self, station_id):
+        self.started += 1
+        if station_id == 0:
+            self.release.wait(5)
+        return {"id": station_id}
+
+
+def test_ordered_window_counts_results_held_back():
+    client = SlowHeadClient()
+    executor = BulkExecutor(client, max_workers=2, ordered=True)
+    results = executor.run(BulkOperation("get_station", (index,)) for index in range(100))
+    consumer = threading.Thread(target=lambda: list(results))
+    consumer.start()
+    time.sleep(0.3)
+    assert client.started <= 4
+    client.release.set()
+    consumer.join(5)
+    assert client.started == 100
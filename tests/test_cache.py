@@ -0,0 +1,55 @@
+import requests
+
+from pycampbellcloud import ResponseCache, Transport
+
+
+def fake_response(size: int, etag: str="v1"):
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["ETag"] = etag
+    response._content = b"x" * size
+    return response
+
+
+def test_pages_sent_as_json_body_are_cached_separately(server):
+    cache = ResponseCache(ttl=60, paths=None)
+    with Transport(cache=cache) as transport, server.client(transport=transport) as client:
+        first = client.list_datastreams(limit=5, offset=0)
+        second = client.list_datastreams(limit=5, offset=5)
+        assert [record["id"] for record in second] == [f"ds-{index:05d}" for index in range(5, 10)]
+        assert first != second
+        assert len(list(client.iter_datastreams(limit=5))) == 500
+
+
+def test_callers_with_different_tokens_do_not_share_entries():
+    cache = ResponseCache(ttl=60, paths=None)
+    url = "https://example.com/api/v1/organizations/org-0/plan"
+    alice = cache.key(url, headers={"Authorization": "Bearer alice"})
+    bob = cache.key(url, headers={"Authorization": "Bearer bob"})
+    cache.store(alice, fake_response(10))
+    assert cache.lookup(alice)[0] is not None
+    assert cache.lookup(bob) == (None, None)
+
+
+def test_cache_is_bounded_by_bytes():
+    cache = ResponseCache(paths=None, max_bytes=1000, max_entry_bytes=600)
+    cache.store(cache.key("https://example.com/big"), fake_response(700))
+    assert cache.stats()["entries"] == 0
+    for index in range(5):
+        cache.store(cache.key(f"https://example.com/{index}"), fake_response(400))
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["bytes"] == 800
+    cache.invalidate("https://example.com/4")
+    assert cache.stats()["bytes"] == 400
+
+
+def test_only_near_static_paths_are_cached_by_default(server):
+    cache = ResponseCache(ttl=60)
+    with Transport(cache=cache) as transport, server.client(transport=transport) as client:
+        client.get_organization_plan()
+        client.get_datastream("ds-00001")
+        server.reset_stats()
+        client.get_organization_plan()
+        client.get_datastream("ds-00001")
+        assert server.requests == 1
+    assert cache.stats()["entries"] == 1
@@ -0,0 +1,27 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from pycampbellcloud import RequestCoalescer, Transport
+
+
+def test_identical_reads_share_one_request(server):
+    server.latency = 0.1
+    coalescer = RequestCoalescer()
+    with Transport(pool_maxsize=8, coalescer=coalescer) as transport, server.client(transport=transport) as client:
+        client.get_organization_plan()
+        server.reset_stats()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: client.get_station("st-0001"), range(8)))
+    assert all(result["id"] == "st-0001" for result in results)
+    assert server.requests < 8
+    assert coalescer.stats()["coalesced"] == 8 - server.requests
+
+
+def test_pages_sent_as_json_body_are_not_coalesced(server):
+    server.latency = 0.1
+    with Transport(pool_maxsize=8, coalescer=RequestCoalescer()) as transport, \
+            server.client(transport=transport) as client:
+        client.get_organization_plan()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            pages = list(pool.map(lambda offset: client.list_datastreams(limit=3, offset=offset), (0, 3, 6, 9)))
+    assert [[record["id"] for record in page] for page in pages] == [
+        [f"ds-{index:05d}" for index in range(offset, offset + 3)] for offset in (0, 3, 6, 9)]
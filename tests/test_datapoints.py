@@ -0,0 +1,29 @@
+import pytest
+
+from pycampbellcloud import ResponseError
+
+
+def test_range_fetch_matches_single_request(server, client):
+    end_epoch = server.data.end_epoch
+    start_epoch = end_epoch - 999 * 60_000
+    points = list(client.iter_datastream_datapoints_range("ds-00001", start_epoch, end_epoch, slice_points=100))
+    expected = client.get_datastream_datapoints("ds-00001", start_epoch, end_epoch, limit=1000)["data"]
+    assert points == expected
+
+
+def test_range_fetch_raises_when_a_slice_fails(server, client):
+    end_epoch = server.data.end_epoch
+    client.get_organization_plan()
+    server.throttle([0, 0, 0, 503])
+    with pytest.raises(ResponseError):
+        list(client.iter_datastream_datapoints_range("ds-00001", end_epoch - 999 * 60_000, end_epoch,
+                                                     slice_points=100, max_workers=1))
+
+
+def test_range_fetch_raises_when_the_count_fails(server, client):
+    end_epoch = server.data.end_epoch
+    client.get_organization_plan()
+    server.throttle([503])
+    with pytest.raises(ResponseError):
+        list(client.iter_datastream_datapoints_range("ds-00001", end_epoch - 999 * 60_000, end_epoch,
+                                                     slice_points=100, max_workers=1))
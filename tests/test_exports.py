@@ -0,0 +1,56 @@
+import pytest
+
+from pycampbellcloud import ExportPipeline, ResponseError
+
+
+def test_wait_for_job_completes(client, tmp_path):
+    pipeline = ExportPipeline(client, str(tmp_path), poll_interval=0.01)
+    job = pipeline.wait_for_job("exp-0", "job-0")
+    assert job["status"] == "complete"
+
+
+def test_missing_job_raises_instead_of_polling(client, tmp_path):
+    pipeline = ExportPipeline(client, str(tmp_path), poll_interval=0.01)
+    with pytest.raises(ResponseError):
+        pipeline.wait_for_job("exp-0", "job-missing")
+
+
+def test_export_without_jobs_raises(client, tmp_path):
+    pipeline = ExportPipeline(client, str(tmp_path), poll_interval=0.01)
+    with pytest.raises(ResponseError):
+        pipeline.wait_for_job("exp-missing")
+
+
+def test_error_listing_jobs_raises(server, client, tmp_path):
+    client.get_organization_plan()
+    server.throttle([503])
+    pipeline = ExportPipeline(client, str(tmp_path), poll_interval=0.01)
+    with pytest.raises(ResponseError):
+        pipeline.wait_for_job("exp-0")
+
+
+def test_error_listing_files_raises(server, client, tmp_path):
+    client.get_organization_plan()
+    # The job poll succeeds, the file listing is throttled
+    server.throttle([0, 503])
+    pipeline = ExportPipeline(client, str(tmp_path), poll_interval=0.01)
+    with pytest.raises(ResponseError):
+        pipeline.download_export("exp-0", "job-0")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_job_without_id_raises(client, tmp_path, monkeypatch):
+    pipeline = ExportPipeline(client, str(tmp_path), poll_interval=0.01)
+    monkeypatch.setattr(pipeline, "wait_for_job", lambda export_id, export_job_id=None: {"status": "complete"})
+    monkeypatch.setattr(pipeline, "download_job", lambda export_id, export_job_id: pytest.fail("job id is missing"))
+    with pytest.raises(ResponseError):
+        pipeline.download_export("exp-0")
+
+
+def test_failed_create_raises_with_the_result(server, client, tmp_path):
+    client.get_organization_plan()
+    server.throttle([503])
+    pipeline = ExportPipeline(client, str(tmp_path), poll_interval=0.01)
+    with pytest.raises(ResponseError) as raised:
+        pipeline.run({"name": "export"})
+    assert raised.value.result == {"message": "Service Unavailable"}
@@ -0,0 +1,32 @@
+import pytest
+
+from pycampbellcloud import FleetSnapshot, ResponseError
+
+
+def test_snapshot_reports_only_changes(server, client):
+    fleet = FleetSnapshot(client, max_workers=4)
+    first = fleet.snapshot()
+    assert len(first.added) == 100 and not first.changed
+    server.data.set_state("st-0001", status="offline")
+    diff = fleet.snapshot()
+    assert diff.changed == {("station", "st-0001"): {"status": "offline", "last_seen": server.data.origin}}
+    assert fleet.suspicious == {("station", "st-0001")}
+
+
+def test_throttled_state_is_a_failure_not_a_change(server, client):
+    fleet = FleetSnapshot(client, max_workers=1)
+    fleet.snapshot()
+    server.throttle([429])
+    diff = fleet.refresh([("station", "st-0001")])
+    assert diff.changed == {}
+    assert diff.failed == {("station", "st-0001"): {"message": "Too Many Requests"}}
+    assert fleet.refresh([("station", "st-0001")]).changed == {}
+
+
+def test_failed_listing_raises_instead_of_removing_everything(server, client):
+    fleet = FleetSnapshot(client)
+    fleet.snapshot()
+    server.throttle([503])
+    with pytest.raises(ResponseError):
+        fleet.snapshot()
+    assert len(fleet) == 100
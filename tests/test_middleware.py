@@ -0,0 +1,28 @@
+from mock_server import MockData, MockServer
+from pycampbellcloud import MetricsMiddleware
+
+
+def test_streamed_calls_are_recorded(server):
+    end_epoch = server.data.end_epoch
+    metrics = MetricsMiddleware()
+    with server.client(middleware=[metrics]) as client:
+        client.get_organization_plan()
+        server.reset_stats()
+        points = list(client.stream_datastream_datapoints("ds-00001", end_epoch - 99 * 60_000, end_epoch, limit=1000))
+    stats = metrics.snapshot()["get_datastream_datapoints"]
+    assert len(points) == 100
+    assert stats["count"] == 1
+    assert stats["status"] == {"200": 1}
+    assert stats["bytes_sum"] == server.bytes_sent
+    assert stats["latency_sum"] >= stats["network_sum"] + stats["decode_sum"] > 0
+
+
+def test_lazy_authentication_is_not_timed_as_the_first_call():
+    metrics = MetricsMiddleware()
+    with MockServer(data=MockData(points=100), latency=0.1) as server:
+        with server.client(middleware=[metrics]) as client:
+            client.list_stations()
+    snapshot = metrics.snapshot()
+    assert snapshot["create_token"]["count"] == 1
+    assert snapshot["list_stations"]["latency_sum"] < 0.18
+    assert snapshot["list_stations"]["network_sum"] < 0.18
@@ -0,0 +1,25 @@
+import pytest
+
+from pycampbellcloud import CampbellCloud, ResponseError, iter_pages
+
+
+def test_iter_pages_raises_on_error_body():
+    pages = {0: [1, 2], 2: {"message": "Too Many Requests"}}
+    with pytest.raises(ResponseError) as raised:
+        list(iter_pages(pages.get, 0, lambda cursor, records: cursor + len(records)))
+    assert raised.value.result == {"message": "Too Many Requests"}
+
+
+def test_iter_datastreams_raises_instead_of_truncating(server, client):
+    assert len(list(client.iter_datastreams(limit=100))) == 500
+    server.throttle([0, 0, 503])
+    with pytest.raises(ResponseError):
+        list(client.iter_datastreams(limit=100))
+
+
+def test_only_endpoints_are_wrapped():
+    for name in ("iter_datastreams", "stream_datapoints", "bulk", "close", "for_organization"):
+        assert name not in CampbellCloud._endpoints
+        assert not hasattr(getattr(CampbellCloud, name), "__wrapped__")
+    for name in ("list_stations", "get_datapoints", "refresh_token"):
+        assert getattr(CampbellCloud, name).__wrapped__.__name__ == name
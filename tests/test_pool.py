@@ -0,0 +1,31 @@
+import pytest
+
+from pycampbellcloud import ClientPool, ResponseError
+
+
+def test_fan_out_records_are_merged_and_tagged(server):
+    with ClientPool("mock-user", "mock-password", regions={"mock": server.api_url}) as pool:
+        records = pool.fan_out_records("list_stations")
+    assert len(records) == 3 * len(server.data.stations)
+    assert {record["organization_id"] for record in records} == {"org-0", "org-1", "org-2"}
+    assert {record["region"] for record in records} == {"mock"}
+
+
+def test_fan_out_records_raises_on_error_body(server):
+    with ClientPool("mock-user", "mock-password", regions={"mock": server.api_url}, max_workers=1) as pool:
+        pool.organizations()
+        server.throttle([0, 429])
+        results = pool.fan_out("list_stations")
+        assert [item.status_code for item in results] == [200, 429, 200]
+        server.throttle([0, 429])
+        with pytest.raises(ResponseError):
+            pool.fan_out_records("list_stations")
+
+
+def test_failed_discovery_raises_and_is_not_cached(server):
+    with ClientPool("mock-user", "mock-password", regions={"mock": server.api_url}) as pool:
+        pool.client("org-0").get_organization_plan()
+        server.throttle([503])
+        with pytest.raises(ResponseError):
+            pool.fan_out_records("list_stations")
+        assert len(pool.fan_out_records("list_stations")) == 3 * len(server.data.stations)
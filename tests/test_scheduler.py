@@ -0,0 +1,69 @@
+import time
+
+from pycampbellcloud import AdaptiveLimiter, RequestScheduler, Transport
+
+
+def scheduled_client(server, **options):
+    scheduler = RequestScheduler(**options)
+    transport = Transport(scheduler=scheduler)
+    return server.client(transport=transport), scheduler, transport
+
+
+def test_retry_after_is_honoured(server):
+    client, scheduler, transport = scheduled_client(server, max_retries=4, backoff_base=0.0)
+    with transport, client:
+        client.get_organization_plan()
+        server.throttle([429, 503], retry_after=0.2)
+        start = time.perf_counter()
+        result = client.get_station("st-0001")
+        elapsed = time.perf_counter() - start
+    assert result["id"] == "st-0001"
+    assert elapsed >= 0.4
+    assert scheduler.stats()["retries"] == 2
+    assert scheduler.stats()["throttled"] == 2
+
+
+def test_non_idempotent_post_is_not_retried(server):
+    client, scheduler, transport = scheduled_client(server, max_retries=4, backoff_base=0.0)
+    with transport, client:
+        client.get_organization_plan()
+        server.throttle([429])
+        result = client.create_station({"name": "not retried"})
+        station = client.get_station("st-0001")
+    assert result == {"message": "Too Many Requests"}
+    assert station["id"] == "st-0001"
+    assert scheduler.stats()["retries"] == 0
+
+
+def test_retries_stop_after_max_retries(server):
+    client, scheduler, transport = scheduled_client(server, max_retries=2, backoff_base=0.0)
+    with transport, client:
+        client.get_organization_plan()
+        server.throttle([503, 503, 503, 503])
+        result = client.get_station("st-0001")
+    assert result == {"message": "Service Unavailable"}
+    assert scheduler.stats()["retries"] == 2
+
+
+def test_aimd_limit_shrinks_on_throttling_and_recovers():
+    limiter = AdaptiveLimiter(initial=16, minimum=2, maximum=16)
+    limiter.on_throttle()
+    assert limiter.limit == 8
+    for _ in range(5):
+        limiter.on_throttle()
+    assert limiter.limit == 2
+    for _ in range(20):
+        limiter.on_success()
+    assert limiter.limit > 2
+
+
+def test_aimd_limit_shrinks_against_throttling_server(server):
+    limiter = AdaptiveLimiter(initial=32, maximum=32)
+    client, scheduler, transport = scheduled_client(server, max_retries=2, backoff_base=0.0, limiter=limiter)
+    with transport, client:
+        client.get_organization_plan()
+        server.throttle([429] * 5)
+        for index in range(5):
+            client.get_station_state(f"st-{index:04d}")
+    assert scheduler.stats()["throttled"] == 5
+    assert limiter.limit < 32
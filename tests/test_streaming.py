@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+import pycampbellcloud
+from pycampbellcloud import iter_json_items
+
+GROUPS = [{"datastream_id": "ds-1", "alias": "a-1", "data": [{"ts": 1, "value": 1.5}, {"ts": 2, "value": 2.5}]},
+          {"data": [[3, 3.5], {"ts": 4, "value": {"nested": [1, 2]}}], "alias": "a-2", "datastream_id": "ds-2"},
+          {"datastream_id": "ds-3", "data": []}]
+EXPECTED = [("ds-1", {"ts": 1, "value": 1.5}), ("ds-1", {"ts": 2, "value": 2.5}),
+            ("a-2", [3, 3.5]), ("a-2", {"ts": 4, "value": {"nested": [1, 2]}})]
+
+
+@pytest.fixture(params=["ijson", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param == "ijson":
+        pytest.importorskip("ijson")
+    else:
+        monkeypatch.setattr(pycampbellcloud, "ijson", None)
+    return request.param
+
+
+def chunked(text: str, size: int):
+    data = text.encode()
+    return [data[index:index + size] for index in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 64, 4096])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_groups_are_yielded_with_their_id(backend, size, indent):
+    assert list(iter_json_items(chunked(json.dumps(GROUPS, indent=indent), size))) == EXPECTED
+
+
+@pytest.mark.parametrize("size", [1, 3, 4096])
+def test_id_after_data_does_not_leak_into_the_next_group(backend, size):
+    text = json.dumps([{"data": [1, 2], "datastream_id": "ds-1"}, {"data": [3], "datastream_id": "ds-2"}])
+    assert list(iter_json_items(chunked(text, size))) == [("ds-1", 1), ("ds-1", 2), ("ds-2", 3)]
+
+
+@pytest.mark.parametrize("size", [1, 5, 4096])
+def test_single_object_yields_bare_elements(backend, size):
+    text = json.dumps({"datastream_id": "ds-1", "data": [{"ts": 1, "value": 0.25}, [2, 3.0]]})
+    assert list(iter_json_items(chunked(text, size))) == [{"ts": 1, "value": 0.25}, [2, 3.0]]
+    assert list(iter_json_items(chunked(json.dumps([1, 2, {"a": 3}]), size), key=None)) == [1, 2, {"a": 3}]
+
+
+def test_stream_datapoints_tags_points_with_their_datastream(backend, server, client):
+    end_epoch = server.data.end_epoch
+    aliases = "alias-00001,alias-00002"
+    streamed = list(client.stream_datapoints(aliases, end_epoch - 9 * 60_000, end_epoch))
+    expected = [(group["datastream_id"], point)
+                for group in client.get_datapoints(aliases, end_epoch - 9 * 60_000, end_epoch)
+                for point in group["data"]]
+    assert streamed == expected
+    assert {datastream_id for datastream_id, _ in streamed} == {"ds-00001", "ds-00002"}
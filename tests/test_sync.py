@@ -0,0 +1,43 @@
+import pytest
+
+from pycampbellcloud import DatastreamSync, ResponseError
+
+
+def test_failed_slice_does_not_advance_the_checkpoint(server, client):
+    end_epoch = server.data.end_epoch
+    start_epoch = end_epoch - 999 * 60_000
+    client.get_organization_plan()
+    with DatastreamSync(client, ":memory:", batch_size=50, initial_start_epoch=start_epoch, max_workers=1,
+                        slice_points=100) as sync:
+        # last, count and two slices succeed, the third slice is throttled
+        server.throttle([0, 0, 0, 0, 503])
+        with pytest.raises(ResponseError):
+            sync.sync_datastream("ds-00001")
+        high_water = sync.high_water("ds-00001")
+        assert high_water < start_epoch + 200 * 60_000
+        written, = sync.connection.execute("SELECT COUNT(*) FROM datapoints").fetchone()
+        assert written == (high_water - start_epoch) // 60_000 + 1
+
+        sync.sync_datastream("ds-00001")
+        count, = sync.connection.execute("SELECT COUNT(*) FROM datapoints").fetchone()
+        assert count == 1000
+        assert sync.high_water("ds-00001") == end_epoch
+
+
+def test_failed_last_read_raises(server, client):
+    client.get_organization_plan()
+    with DatastreamSync(client, ":memory:") as sync:
+        server.throttle([503])
+        with pytest.raises(ResponseError):
+            sync.sync_datastream("ds-00001")
+        assert sync.high_water("ds-00001") is None
+
+
+def test_bare_last_point_is_accepted(server, client, monkeypatch):
+    end_epoch = server.data.end_epoch
+    client.get_organization_plan()
+    monkeypatch.setattr(client, "get_datastream_datapoints_last",
+                        lambda datastream_id: {"ts": end_epoch, "value": 1.0})
+    with DatastreamSync(client, ":memory:", initial_start_epoch=end_epoch - 99 * 60_000) as sync:
+        assert sync.sync_datastream("ds-00001") == 100
+        assert sync.high_water("ds-00001") == end_epoch